@@ -0,0 +1,124 @@
+""" Memory used by typecheck for every decorated function.
+
+    Every case generates a module of NUMBER functions with the same
+    signature and checks, as a code generator would, and measures
+    with tracemalloc the bytes that decorating them adds per function,
+    and the bytes added by calling each of them once (which builds
+    their wrappers).
+
+    Usage:
+        python bench_memory.py [-n NUMBER] [--max-bytes BYTES] [CASE ...]
+
+    With --max-bytes the script exits with status 1 if any case
+    uses more than BYTES per decorated and called function.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+import types
+
+from typechecker import typecheck
+
+# name -> (parameters, decorator arguments, call arguments)
+CASES = {
+    "positional" : ("a, b", "int, str", "(1, 'x')"),
+    "defaults" : ("a, b=1, *, c=None", "int, int, c=(str, None)", "(1)"),
+    "return" : ("a, b", "int, float, check_return_type=int", "(1, 2.0)"),
+    "params-5" : ("a, b, c, d, e", "int, str, float, bytes, dict", "(1, 'x', 2.0, b'', {})"),
+    "container" : ("ids, names", "list[int], dict[str, float]", "([1, 2], {'a' : 1.0})"),
+    "forward" : ("a, b", "'Later', int", "(Later(), 1)"),
+}
+
+def module_source(parameters, decorator, number):
+    """ Returns the source of a module of number functions """
+    lines = ["class Later:", "    pass", ""]
+    for i in range(number):
+        if decorator is not None:
+            lines.append(f"@typecheck({decorator})")
+        lines.append(f"def function_{i}({parameters}):")
+        lines.append("    return a" if parameters.startswith("a,") else "    pass")
+    return "\n".join(lines) + "\n"
+
+def measure(step):
+    """ Returns the bytes allocated by step that are still alive, and its result """
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = step()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, result
+
+def load(name, parameters, decorator, number):
+    """ Returns the namespace of the generated module """
+    source = module_source(parameters, decorator, number)
+    code = compile(source, f"<{name}>", "exec") # Outside of the measure
+    def execute():
+        # A real module, so that names in specs resolve
+        module = types.ModuleType(f"generated_{name}")
+        module.typecheck = typecheck
+        sys.modules[module.__name__] = module
+        exec(code, vars(module))
+        return vars(module)
+    return execute
+
+def call_all(namespace, call, number):
+    """ Calls every generated function once """
+    def execute():
+        args = eval(call, namespace)
+        args = args if isinstance(args, tuple) else (args,)
+        for i in range(number):
+            namespace[f"function_{i}"](*args)
+    return execute
+
+def run(names, number):
+    """ Runs the named cases and returns a list of result dicts """
+    results = []
+    tracemalloc.start()
+    for name in names:
+        parameters, decorator, call = CASES[name]
+        bare_bytes, bare = measure(load(name, parameters, None, number))
+        checked_bytes, checked = measure(load(name, parameters, decorator, number))
+        called_bytes, _ = measure(call_all(checked, call, number))
+        results.append({
+            "case" : name,
+            "bare_bytes" : bare_bytes / number,
+            "decorated_bytes" : (checked_bytes - bare_bytes) / number,
+            "called_bytes" : (checked_bytes - bare_bytes + called_bytes) / number,
+        })
+        del bare, checked
+        sys.modules.pop(f"generated_{name}", None)
+    tracemalloc.stop()
+    return results
+
+def report(results):
+    print(f"{'case':<12}{'bare B/fn':>12}{'decorated B/fn':>16}{'called B/fn':>14}")
+    for r in results:
+        print(f"{r['case']:<12}{r['bare_bytes']:>12.0f}{r['decorated_bytes']:>16.0f}"
+              f"{r['called_bytes']:>14.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark typecheck memory per function")
+    parser.add_argument("cases", nargs="*", help="cases to run (default: all)")
+    parser.add_argument("-n", "--number", type=int, default=2000,
+                        help="functions generated per case")
+    parser.add_argument("--max-bytes", type=float, default=None,
+                        help="fail if a called function costs more bytes than this")
+    options = parser.parse_args(argv)
+
+    names = options.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run(names, options.number)
+    report(results)
+
+    if options.max_bytes is not None:
+        large = [r["case"] for r in results if r["called_bytes"] > options.max_bytes]
+        if large:
+            print(f"Over the {options.max_bytes:.0f} bytes budget: {', '.join(large)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
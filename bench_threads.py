@@ -0,0 +1,113 @@
+""" Throughput of decorated functions called from many threads.
+
+    Every case of bench_typechecker is called from pools of 1, 2, 4
+    and 8 threads, bare and decorated, and the script reports the
+    calls per second and how they scale with the number of threads.
+    Checking reads its plan without locks, so on free-threaded
+    Python the checked calls should scale like the bare calls. With
+    the GIL neither scales, and the efficiency only shows that
+    checking adds no contention of its own.
+
+    Usage:
+        python bench_threads.py [-n NUMBER] [-t THREADS ...] [--min-efficiency E] [CASE ...]
+
+    With --min-efficiency the script exits with status 1 if, at any
+    thread count, the scaling of the checked calls is less than E
+    times the scaling of the bare calls.
+"""
+import argparse
+import inspect
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_typechecker import CASES
+
+DEFAULT_CASES = ("positional", "abc-protocol", "stats", "sampled")
+
+def throughput(fn, args, kwargs, threads, number):
+    """ Returns the calls per second of threads threads, started
+        together, each calling fn number times
+    """
+    barrier = threading.Barrier(threads)
+
+    def work(_):
+        barrier.wait()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(*args, **kwargs)
+        return start, time.perf_counter()
+
+    best = None
+    with ThreadPoolExecutor(threads) as pool:
+        for _ in range(3):
+            spans = list(pool.map(work, range(threads)))
+            elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+            best = elapsed if best is None else min(best, elapsed)
+    return threads * number / best
+
+def run(names, thread_counts, number):
+    """ Runs the named cases and returns a list of result dicts """
+    results = []
+    for name in names:
+        bare, checked, args, kwargs = CASES[name]()
+        if inspect.iscoroutinefunction(bare):
+            continue # Coroutines scale with the event loop, not threads
+        base = None
+        for threads in thread_counts:
+            bare_rate = throughput(bare, args, kwargs, threads, number)
+            checked_rate = throughput(checked, args, kwargs, threads, number)
+            if base is None:
+                base = (bare_rate, checked_rate)
+            bare_scaling = bare_rate / base[0]
+            checked_scaling = checked_rate / base[1]
+            results.append({
+                "case" : name,
+                "threads" : threads,
+                "bare_calls_s" : bare_rate,
+                "checked_calls_s" : checked_rate,
+                "bare_scaling" : bare_scaling,
+                "checked_scaling" : checked_scaling,
+                "efficiency" : checked_scaling / bare_scaling,
+            })
+    return results
+
+def report(results):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'case':<16}{'threads':>8}{'bare calls/s':>14}{'checked calls/s':>17}"
+          f"{'bare x':>8}{'checked x':>11}{'efficiency':>12}")
+    for r in results:
+        print(f"{r['case']:<16}{r['threads']:>8}{r['bare_calls_s']:>14.0f}"
+              f"{r['checked_calls_s']:>17.0f}{r['bare_scaling']:>8.2f}"
+              f"{r['checked_scaling']:>11.2f}{r['efficiency']:>12.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark typecheck throughput with threads")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: {' '.join(DEFAULT_CASES)})")
+    parser.add_argument("-n", "--number", type=int, default=20000,
+                        help="calls per thread per timing run")
+    parser.add_argument("-t", "--threads", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="thread counts to run")
+    parser.add_argument("--min-efficiency", type=float, default=None,
+                        help="fail if checked calls scale less than this fraction of bare calls")
+    options = parser.parse_args(argv)
+
+    names = options.cases or list(DEFAULT_CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run(names, options.threads, options.number)
+    report(results)
+
+    if options.min_efficiency is not None:
+        slow = sorted({r["case"] for r in results if r["efficiency"] < options.min_efficiency})
+        if slow:
+            print(f"Under the {options.min_efficiency} efficiency budget: {', '.join(slow)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+""" Benchmarks of the per-call overhead of the typecheck decorator.
+
+    Every case times a bare function against the same function
+    decorated with typecheck, and reports the overhead in ns/call
+    and the memory allocated by a single call. Coroutine functions
+    are timed as tasks of a large asyncio.gather.
+
+    Usage:
+        python bench_typechecker.py [-n NUMBER] [--max-ratio RATIO] [CASE ...]
+
+    With --max-ratio the script exits with status 1 if any case
+    is more than RATIO times slower than the bare call.
+"""
+import argparse
+import asyncio
+import inspect
+import sys
+import time
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from collections.abc import Sequence
+from typing import Annotated, Literal, Optional, Protocol, runtime_checkable
+
+from typechecker import typecheck, AttributeSpec
+
+CASES = {}
+
+def case(name):
+    """ Registers a function returning (bare, checked, args, kwargs) """
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+def make_params(n):
+    """ Returns a function taking n parameters and a matching
+        decorated version checking all of them as int.
+    """
+    params = ", ".join(f"p{i}" for i in range(n))
+    namespace = {}
+    exec(f"def bare({params}):\n    return p0\n", namespace)
+    bare = namespace["bare"]
+    return bare, typecheck(*([int] * n))(bare), tuple(range(n)), {}
+
+@case("positional")
+def positional():
+    def bare(a, b):
+        return a
+    return bare, typecheck(int, float)(bare), (1, 2.0), {}
+
+@case("keyword")
+def keyword():
+    def bare(a, b):
+        return a
+    return bare, typecheck(a=int, b=float)(bare), (), {"a" : 1, "b" : 2.0}
+
+@case("tuple-union")
+def tuple_union():
+    def bare(a, b):
+        return a
+    return bare, typecheck((int, float, str), (bytes, str))(bare), (1.0, "b"), {}
+
+@case("class-instance")
+def class_instance():
+    class Base:
+        pass
+
+    class Foo(Base):
+        pass
+
+    def bare(obj):
+        return obj
+    return bare, typecheck(Base)(bare), (Foo(),), {}
+
+@case("abc-protocol")
+def abc_protocol():
+    @runtime_checkable
+    class Closer(Protocol):
+        def close(self): ...
+
+    class File:
+        def close(self):
+            pass
+
+    def bare(a, b):
+        return a
+    return bare, typecheck(Sequence, Closer)(bare), ([1], File()), {}
+
+@case("attribute-spec")
+def attribute_spec():
+    class File:
+        def read(self):
+            pass
+
+        def close(self):
+            pass
+
+    def bare(f):
+        return f
+    return bare, typecheck(AttributeSpec("read", "close"))(bare), (File(),), {}
+
+@case("callable")
+def callable_check():
+    def bare(fn):
+        return fn
+    return bare, typecheck(callable)(bare), (len,), {}
+
+@case("return-type")
+def return_type():
+    def bare(a):
+        return a
+    return bare, typecheck(int, check_return_type=int)(bare), (1,), {}
+
+@case("method")
+def method():
+    class Foo:
+        def bare(self, i):
+            return i
+
+        @typecheck(i=int)
+        def checked(self, i):
+            return i
+
+    foo = Foo()
+    return foo.bare, foo.checked, (1,), {}
+
+@case("stats")
+def stats():
+    def bare(a, b):
+        return a
+    return bare, typecheck(int, float, check_stats=True)(bare), (1, 2.0), {}
+
+@case("suppressed")
+def suppressed():
+    def bare(a, b):
+        return a
+    checked = typecheck(int, float, check_mode=lambda error, suppressed: None)(bare)
+    return bare, checked, ("1", 2.0), {}
+
+@case("sampled")
+def sampled():
+    def bare(a, b):
+        return a
+    return bare, typecheck(int, float, check_every=100)(bare), (1, 2.0), {}
+
+@case("observe")
+def observe():
+    def bare(a, b):
+        return a
+    return bare, typecheck.observe(bare), (1, 2.0), {}
+
+@case("observe-every-call")
+def observe_every_call():
+    def bare(a, b):
+        return a
+    return bare, typecheck.observe(every=1)(bare), (1, 2.0), {}
+
+@case("optional")
+def optional():
+    def bare(a, b):
+        return a
+    return bare, typecheck(Optional[int], float | None)(bare), (1, 2.0), {}
+
+@case("literal")
+def literal():
+    def bare(a, b):
+        return a
+    return bare, typecheck(Literal["r", "w"], Literal[1, 2, 3])(bare), ("r", 2), {}
+
+@case("optional-literal")
+def optional_literal():
+    def bare(a, b):
+        return a
+    return bare, typecheck(Optional[Literal["r", "w"]], Annotated[int, "size"])(bare), ("r", 2), {}
+
+@case("list-full")
+def list_full():
+    def bare(ids):
+        return ids
+    return bare, typecheck(list[int])(bare), (list(range(100000)),), {}
+
+@case("list-edges")
+def list_edges():
+    def bare(ids):
+        return ids
+    return bare, typecheck(list[int], check_elements="edges")(bare), (list(range(100000)),), {}
+
+@case("list-random")
+def list_random():
+    def bare(ids):
+        return ids
+    return bare, typecheck(list[int], check_elements="random")(bare), (list(range(100000)),), {}
+
+@case("async")
+def async_args():
+    async def bare(a, b):
+        return a
+    return bare, typecheck(int, float)(bare), (1, 2.0), {}
+
+@case("async-return")
+def async_return():
+    async def bare(a, b):
+        return a
+    return bare, typecheck(int, float, check_return_type=int)(bare), (1, 2.0), {}
+
+@case("generator")
+def generator():
+    def bare(n):
+        yield from range(n)
+
+    def consume(fn):
+        def run(n):
+            for _ in fn(n):
+                pass
+        return run
+
+    checked = typecheck(int, check_yield_type=int)(bare)
+    return consume(bare), consume(checked), (1000,), {}
+
+@case("record")
+def record():
+    @dataclass
+    class Bare:
+        x: int
+        y: float
+        name: str = ""
+
+    @typecheck.record
+    @dataclass
+    class Checked:
+        x: int
+        y: float
+        name: str = ""
+
+    return Bare, Checked, (1, 2.0, "p"), {}
+
+@case("record-slots")
+def record_slots():
+    @dataclass(slots=True)
+    class Bare:
+        x: int
+        y: float
+        name: str = ""
+
+    @typecheck.record(slots=True)
+    class Checked:
+        x: int
+        y: float
+        name: str = ""
+
+    return Bare, Checked, (1, 2.0, "p"), {}
+
+@case("record-setattr")
+def record_setattr():
+    @dataclass(slots=True)
+    class Bare:
+        x: int
+
+    @typecheck.record(check_setattr=True, slots=True)
+    class Checked:
+        x: int
+
+    bare_record, checked_record = Bare(1), Checked(1)
+
+    def bare(x):
+        bare_record.x = x
+
+    def checked(x):
+        checked_record.x = x
+    return bare, checked, (2,), {}
+
+@case("params-1")
+def params_1():
+    return make_params(1)
+
+@case("params-5")
+def params_5():
+    return make_params(5)
+
+@case("params-20")
+def params_20():
+    return make_params(20)
+
+def time_call(fn, args, kwargs, number):
+    """ Returns the best time of a call to fn in ns """
+    timer = timeit.Timer(lambda: fn(*args, **kwargs))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+def time_gather(fn, args, kwargs, number):
+    """ Returns the best time per task, in ns, of gathering
+        number concurrent calls to the coroutine function fn
+    """
+    async def gather():
+        await asyncio.gather(*[fn(*args, **kwargs) for _ in range(number)])
+
+    best = None
+    for _ in range(5):
+        loop = asyncio.new_event_loop()
+        try:
+            start = time.perf_counter()
+            loop.run_until_complete(gather())
+            elapsed = time.perf_counter() - start
+        finally:
+            loop.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best / number * 1e9
+
+def run_call(fn, args, kwargs):
+    """ Calls fn, running it to completion if it is a coroutine function """
+    result = fn(*args, **kwargs)
+    if inspect.iscoroutine(result):
+        try:
+            result.send(None)
+        except StopIteration:
+            pass
+
+def allocated_per_call(fn, args, kwargs):
+    """ Returns the peak number of bytes allocated by a call to fn """
+    run_call(fn, args, kwargs) # Warm up caches
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        run_call(fn, args, kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - current
+
+def run(names, number):
+    """ Runs the named cases and returns a list of result dicts """
+    results = []
+    for name in names:
+        bare, checked, args, kwargs = CASES[name]()
+        timer = time_gather if inspect.iscoroutinefunction(bare) else time_call
+        bare_ns = timer(bare, args, kwargs, number)
+        checked_ns = timer(checked, args, kwargs, number)
+        results.append({
+            "case" : name,
+            "bare_ns" : bare_ns,
+            "checked_ns" : checked_ns,
+            "overhead_ns" : checked_ns - bare_ns,
+            "ratio" : checked_ns / bare_ns,
+            "bare_bytes" : allocated_per_call(bare, args, kwargs),
+            "checked_bytes" : allocated_per_call(checked, args, kwargs),
+        })
+    return results
+
+def report(results):
+    print(f"{'case':<16}{'bare ns':>10}{'checked ns':>12}{'overhead ns':>13}"
+          f"{'ratio':>8}{'bare B':>9}{'checked B':>11}")
+    for r in results:
+        print(f"{r['case']:<16}{r['bare_ns']:>10.1f}{r['checked_ns']:>12.1f}"
+              f"{r['overhead_ns']:>13.1f}{r['ratio']:>8.2f}"
+              f"{r['bare_bytes']:>9}{r['checked_bytes']:>11}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark typecheck overhead")
+    parser.add_argument("cases", nargs="*", help="cases to run (default: all)")
+    parser.add_argument("-n", "--number", type=int, default=100000,
+                        help="calls per timing run")
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="fail if a case is more than this many times slower than bare")
+    options = parser.parse_args(argv)
+
+    names = options.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run(names, options.number)
+    report(results)
+
+    if options.max_ratio is not None:
+        slow = [r["case"] for r in results if r["ratio"] > options.max_ratio]
+        if slow:
+            print(f"Over the {options.max_ratio}x budget: {', '.join(slow)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,33 @@
+import asyncio
+import gc
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
-from typechecker import typecheck, TypeCheckError
+import weakref
+from abc import ABCMeta
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, InitVar
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections.abc import Callable, Generator, AsyncGenerator, Iterable, Iterator, Sequence, Sized
+from typing import Annotated, Any, Literal, NewType, Optional, Protocol, Self, TypedDict, TypeVar, Union, runtime_checkable
+from typechecker import typecheck, TypeCheckError, ArraySpec, ArgumentTypeError, AttributeSpec
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@typecheck.from_hints
+def hinted_before_definition(a: "DefinedLater") -> "DefinedLater":
+    return a
 
 class TestTypeChecker(unittest.TestCase):
 
@@ -41,18 +69,18 @@ class TestTypeChecker(unittest.TestCase):
 
     def test_bad_check_kwargs(self):
         # Given
-        @typecheck(baz=int)
         def foo(bar):
             return bar
 
         # When
         with self.assertRaises(TypeCheckError) as e:
-            res = foo(5)
+            typecheck(baz=int)(foo)
 
         # Then
         self.assertTrue(str(e.exception).startswith("The given kwarg 'baz' "\
                 "is not a parameter of function '<function TestTypeChecker."\
                 "test_bad_check_kwargs.<locals>.foo at"))
+        self.assertEqual((e.exception.function, e.exception.parameter), ("foo", "baz"))
 
     def test_check_multiple_kwargs(self):
         # Given
@@ -742,16 +770,16 @@ class TestTypeChecker(unittest.TestCase):
 
     def test_set_same_arg_with_kwarg(self):
         # Given
-        @typecheck(int, a=str)
         def foo(a, b):
             pass
 
         # When
         with self.assertRaises(TypeCheckError) as e:
-            foo(1, 3)
+            typecheck(int, a=str)(foo)
 
         # Then
         self.assertEqual(str(e.exception), "The kwarg 'a' is already set by arg")
+        self.assertEqual((e.exception.function, e.exception.parameter), ("foo", "a"))
 
     def test_return_value_check(self):
         # Given
@@ -914,6 +942,161 @@ class TestTypeChecker(unittest.TestCase):
         self.assertEqual(res, (1, None))
 
 
+    def test_ignore_default_value_with_type_hint(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, b: str = None):
+            return (a, b)
+
+        # When
+        res = foo(1)
+
+        # Then
+        self.assertEqual(res, (1, None))
+
+    def test_check_keyword_only(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, *, b):
+            return (a, b)
+
+        # When
+        res = foo(1, b="2")
+
+        with self.assertRaises(TypeError):
+            foo(1, b=2)
+
+        # Then
+        self.assertEqual(res, (1, "2"))
+
+    def test_check_positional_only(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, /, b="1"):
+            return (a, b)
+
+        # When
+        res1 = foo(1)
+        res2 = foo(1, b="2")
+
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertEqual(res1, (1, "1"))
+        self.assertEqual(res2, (1, "2"))
+
+    def test_check_variadic_parameters(self):
+        # Given
+        @typecheck(int, b=str)
+        def foo(a, *args, b="1", **kwargs):
+            return (a, args, b, kwargs)
+
+        # When
+        res = foo(1, 2, 3, b="4", c=5)
+
+        with self.assertRaises(TypeError):
+            foo(1, 2, b=3)
+
+        # Then
+        self.assertEqual(res, (1, (2, 3), "4", {"c" : 5}))
+
+    def test_check_explicit_default_value(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, b=None):
+            return (a, b)
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            foo(1, None)
+
+        # Then
+        self.assertEqual(str(e.exception),
+                "The value 'None' sent to parameter 'b' of function 'foo' "\
+                "is of type <class 'NoneType'>, expected type <class 'str'>")
+
+    def test_fallback_wrapper(self):
+        # Given
+        @typecheck(int, str)
+        def foo(_tc_a, b="1"):
+            return (_tc_a, b)
+
+        # When
+        res = foo(1)
+
+        with self.assertRaises(TypeError):
+            foo(1, 2)
+
+        with self.assertRaises(TypeCheckError):
+            foo(b="2")
+
+        # Then
+        self.assertEqual(res, (1, "1"))
+
+    def test_class_outside_main(self):
+        # Given
+        Foo = type("Foo", (), {"__module__" : "not_importable"})
+
+        @typecheck(Foo, check_return_type=Foo)
+        def bar(obj):
+            return obj
+
+        # When
+        foo = Foo()
+        res = bar(foo)
+
+        with self.assertRaises(TypeError):
+            bar(5)
+
+        # Then
+        self.assertIs(res, foo)
+
+    def test_check_type_names(self):
+        # Given
+        @typecheck("int", ("str", None), "collections.OrderedDict")
+        def foo(a, b, c):
+            return (a, b, c)
+
+        # When
+        res = foo(1, None, OrderedDict())
+
+        with self.assertRaises(TypeError) as e:
+            foo(1, 2, OrderedDict())
+
+        # Then
+        self.assertEqual(res, (1, None, OrderedDict()))
+        self.assertEqual(str(e.exception),
+                "The value '2' sent to parameter 'b' of function 'foo' "\
+                "is of type <class 'int'>, expected type "\
+                "(<class 'str'>, <class 'NoneType'>)")
+
+    def test_check_forward_reference(self):
+        # Given
+        @typecheck("DefinedLater")
+        def foo(obj):
+            return obj
+
+        # When
+        obj = DefinedLater()
+        res = foo(obj)
+
+        # Then
+        self.assertIs(res, obj)
+
+    def test_unknown_type_name(self):
+        # Given
+        @typecheck("NoSuchType")
+        def foo(obj):
+            return obj
+
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            foo(1)
+
+        # Then
+        self.assertEqual(str(e.exception), "Could not resolve the type 'NoSuchType'")
+
     def test_no_value_given(self):
         # Given
         @typecheck(int)
@@ -928,5 +1111,2554 @@ class TestTypeChecker(unittest.TestCase):
         self.assertEqual(str(e.exception), \
                 "The parameter 'a' got no value")
 
+class TestContainers(unittest.TestCase):
+
+    def test_list_elements(self):
+        # Given
+        @typecheck(list[int])
+        def foo(a):
+            return a
+
+        # When
+        res = foo([1, 2, 3])
+
+        with self.assertRaises(TypeError) as e:
+            foo([1, "2", 3])
+
+        # Then
+        self.assertEqual(res, [1, 2, 3])
+        self.assertEqual(str(e.exception),
+                "The value '[1, '2', 3]' sent to parameter 'a' of function 'foo' "\
+                "is of type <class 'list'>, expected type list[int]")
+
+    def test_callable_alias_checks_origin(self):
+        # Given
+        @typecheck(Callable[[int], str])
+        def foo(f):
+            return f
+
+        # When
+        res = foo(str)
+
+        with self.assertRaises(TypeError):
+            foo(1)
+
+        # Then
+        self.assertIs(res, str)
+
+    def test_type_alias_checks_subclass(self):
+        # Given
+        @typecheck(type[int])
+        def foo(cls):
+            return cls
+
+        # When
+        res = foo(bool)
+
+        with self.assertRaises(TypeError):
+            foo(str)
+        with self.assertRaises(TypeError):
+            foo(1)
+
+        # Then
+        self.assertIs(res, bool)
+
+    def test_iterator_alias_is_not_consumed(self):
+        # Given
+        @typecheck(Iterator[int])
+        def foo(it):
+            return it
+
+        # When
+        res = list(foo(iter([1, 2, 3])))
+
+        with self.assertRaises(TypeError):
+            foo([1, 2, 3])
+
+        # Then
+        self.assertEqual(res, [1, 2, 3])
+
+    def test_iterable_alias_given_generator(self):
+        # Given
+        @typecheck(Iterable[int])
+        def foo(values):
+            return list(values)
+
+        # When
+        res = foo(i for i in range(3))
+
+        # Then
+        self.assertEqual(res, [0, 1, 2])
+
+    def test_dict_elements(self):
+        # Given
+        @typecheck(dict[str, float])
+        def foo(a):
+            return a
+
+        # When
+        res = foo({"a" : 1.0, "b" : 2.0})
+
+        with self.assertRaises(TypeError):
+            foo({"a" : 1.0, 2 : 2.0})
+
+        with self.assertRaises(TypeError):
+            foo({"a" : 1.0, "b" : 2})
+
+        # Then
+        self.assertEqual(res, {"a" : 1.0, "b" : 2.0})
+
+    def test_tuple_elements(self):
+        # Given
+        @typecheck(tuple[int, ...], tuple[int, str])
+        def foo(a, b):
+            return (a, b)
+
+        # When
+        res = foo((1, 2, 3), (1, "2"))
+
+        with self.assertRaises(TypeError):
+            foo((1, 2, "3"), (1, "2"))
+
+        with self.assertRaises(TypeError):
+            foo((1, 2, 3), (1, "2", 3))
+
+        # Then
+        self.assertEqual(res, ((1, 2, 3), (1, "2")))
+
+    def test_nested_elements(self):
+        # Given
+        @typecheck(dict[str, list[int]], check_return_type=list[str])
+        def foo(a):
+            return list(a)
+
+        # When
+        res = foo({"a" : [1, 2], "b" : []})
+
+        with self.assertRaises(TypeError):
+            foo({"a" : [1, 2.0]})
+
+        # Then
+        self.assertEqual(res, ["a", "b"])
+
+    def test_edges_strategy(self):
+        # Given
+        @typecheck(list[int], set[int], check_elements=("edges", 2))
+        def foo(a, b):
+            return a
+
+        values = [1, 2, "3", 4, 5]
+
+        # When
+        res = foo(values, {1, 2})
+
+        with self.assertRaises(TypeError):
+            foo([1, 2, "3", 4], {1, 2})
+
+        # Then
+        self.assertIs(res, values)
+
+    def test_edges_strategy_deque(self):
+        # Given
+        @typecheck(deque[int], check_elements=("edges", 2))
+        def foo(a):
+            return a
+
+        values = deque(range(100))
+
+        # When
+        res = foo(values)
+
+        with self.assertRaises(TypeError):
+            foo(deque([*range(99), "x"]))
+
+        # Then
+        self.assertIs(res, values)
+
+    def test_edges_strategy_sequence_without_slices(self):
+        # Given
+        class Numbers(Sequence):
+            def __init__(self, values):
+                self.values = values
+
+            def __len__(self):
+                return len(self.values)
+
+            def __getitem__(self, index):
+                if not 0 <= index < len(self.values):
+                    raise IndexError(index)
+                return self.values[index]
+
+        @typecheck(Sequence[int], check_elements=("edges", 2))
+        def foo(a):
+            return a
+
+        values = Numbers(list(range(10)))
+
+        # When
+        res = foo(values)
+
+        with self.assertRaises(TypeError):
+            foo(Numbers(["x", *range(9)]))
+
+        # Then
+        self.assertIs(res, values)
+
+    def test_random_strategy(self):
+        # Given
+        @typecheck(list[int], check_elements=("random", 3))
+        def foo(a):
+            return a
+
+        # When
+        res = foo(list(range(100)))
+
+        with self.assertRaises(TypeError):
+            foo(["0"] * 100)
+
+        # Then
+        self.assertEqual(res, list(range(100)))
+
+    def test_bad_strategy(self):
+        # Given
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            typecheck(list[int], check_elements="some")(foo)
+
+        # Then
+        self.assertEqual(str(e.exception), "Unknown element check strategy 'some', "\
+                "expected one of full, edges, random")
+
+    def test_bad_strategy_without_containers(self):
+        # Given
+        def foo(a):
+            return a
+
+        # When
+        for check_elements in ("bogus", ("edges", 0), 3):
+            with self.assertRaises(TypeCheckError):
+                typecheck(int, check_elements=check_elements)(foo)
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestArraySpec(unittest.TestCase):
+
+    def test_dtype_and_shape(self):
+        # Given
+        @typecheck(ArraySpec(dtype=np.float64, shape=(None, 3)))
+        def foo(a):
+            return a.shape
+
+        # When
+        res = foo(np.zeros((5, 3)))
+
+        with self.assertRaises(TypeError) as e:
+            foo(np.zeros((5, 4)))
+
+        with self.assertRaises(TypeError):
+            foo(np.zeros((5, 3), dtype=np.float32))
+
+        with self.assertRaises(TypeError):
+            foo([[0.0, 0.0, 0.0]])
+
+        # Then
+        self.assertEqual(res, (5, 3))
+        self.assertTrue(str(e.exception).endswith(
+                "expected type ndarray[dtype=float64, shape=(*, 3)]"))
+
+    def test_abstract_dtype(self):
+        # Given
+        @typecheck(ArraySpec(dtype=np.floating, ndim=1))
+        def foo(a):
+            return a.dtype
+
+        # When
+        res1 = foo(np.zeros(3, dtype=np.float32))
+        res2 = foo(np.zeros(3, dtype=np.float64))
+
+        with self.assertRaises(TypeError):
+            foo(np.zeros(3, dtype=np.int64))
+
+        with self.assertRaises(TypeError):
+            foo(np.zeros((3, 3)))
+
+        # Then
+        self.assertEqual((res1, res2), (np.float32, np.float64))
+
+    def test_contiguous(self):
+        # Given
+        @typecheck(ArraySpec(contiguous="C"))
+        def foo(a):
+            return a
+
+        array = np.zeros((4, 4))
+
+        # When
+        res = foo(array)
+
+        with self.assertRaises(TypeError):
+            foo(array[:, ::2])
+
+        # Then
+        self.assertIs(res, array)
+
+    def test_finite(self):
+        # Given
+        @typecheck(ArraySpec(finite=True))
+        def foo(a):
+            return a
+
+        # When
+        res = foo(np.arange(3))
+
+        with self.assertRaises(TypeError):
+            foo(np.array([1.0, np.nan]))
+
+        # Then
+        self.assertEqual(list(res), [0, 1, 2])
+
+@unittest.skipIf(np is not None, "numpy is installed")
+class TestArraySpecWithoutNumpy(unittest.TestCase):
+
+    def test_array_spec_without_numpy(self):
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            ArraySpec(ndim=2)
+
+        # Then
+        self.assertEqual(str(e.exception), "Array specs need numpy, which is not installed")
+
+class TestValidateBatch(unittest.TestCase):
+
+    def test_validate_batch(self):
+        # Given
+        class Foo:
+            pass
+
+        @typecheck(int, (str, None), c=Foo)
+        def foo(a, b, c=None):
+            return (a, b, c)
+
+        rows = [
+            (1, "2", Foo()),
+            (1, None),
+            ("1", "2"),
+            {"a" : 1, "b" : "2", "c" : 3},
+            {"b" : "2"},
+            (1, 2.0, Foo()),
+        ]
+
+        # When
+        res = typecheck.validate_batch(foo, rows)
+
+        # Then
+        self.assertEqual(res, [True, True, False, False, False, False])
+
+    def test_validate_batch_too_many_args(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, b):
+            return (a, b)
+
+        @typecheck(int, str)
+        def bar(a, b, *args):
+            return (a, b)
+
+        rows = [(1, "x"), (1, "x", 3, 4)]
+
+        # When
+        res = [typecheck.validate_batch(foo, rows), typecheck.validate_batch(bar, rows)]
+
+        # Then
+        self.assertEqual(res, [[True, False], [True, True]])
+
+    def test_validate_batch_unknown_keys(self):
+        # Given
+        @typecheck(int, str)
+        def foo(a, b):
+            return (a, b)
+
+        @typecheck(int, str)
+        def bar(a, b, **kwargs):
+            return (a, b)
+
+        @typecheck(int)
+        def po(a, /):
+            return a
+
+        rows = [{"a" : 1, "b" : "x"}, {"a" : 1, "b" : "x", "zzz" : 2}]
+
+        # When
+        res = [typecheck.validate_batch(foo, rows), typecheck.validate_batch(bar, rows),
+               typecheck.validate_batch(po, [(1,), {"a" : 1}])]
+
+        # Then
+        self.assertEqual(res, [[True, False], [True, True], [True, False]])
+
+    def test_validate_batch_value_checks(self):
+        # Given
+        @typecheck(list[int], callable)
+        def foo(a, fn):
+            return a
+
+        rows = ([[1, 2], len], [[1, "2"], len], [[], 5], ([3], print))
+
+        # When
+        res = typecheck.validate_batch(foo, rows)
+
+        # Then
+        self.assertEqual(res, [True, False, False, True])
+
+    def test_validate_batch_not_decorated(self):
+        # Given
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError):
+            typecheck.validate_batch(foo, [(1,)])
+
+class TestErrors(unittest.TestCase):
+
+    def test_error_fields(self):
+        # Given
+        @typecheck(int, check_return_type=str)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(ArgumentTypeError) as e1:
+            foo("1")
+
+        with self.assertRaises(ArgumentTypeError) as e2:
+            foo(1)
+
+        # Then
+        self.assertEqual((e1.exception.function, e1.exception.parameter,
+                          e1.exception.expected, e1.exception.actual), ("foo", "a", int, str))
+        self.assertEqual((e2.exception.function, e2.exception.parameter,
+                          e2.exception.expected, e2.exception.actual), ("foo", None, str, int))
+        self.assertIsInstance(e1.exception, TypeError)
+
+    def test_missing_value_fields(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            foo()
+
+        # Then
+        self.assertEqual((e.exception.function, e.exception.parameter), ("foo", "a"))
+
+    def test_large_value_truncated(self):
+        # Given
+        @typecheck(str, int)
+        def foo(a, b):
+            return a
+
+        # When
+        with self.assertRaises(TypeError) as e1:
+            foo(b"x" * 10**7, 1)
+
+        with self.assertRaises(TypeError) as e2:
+            foo("1", "y" * 10**7)
+
+        # Then
+        self.assertEqual(str(e1.exception),
+                "The value '" + repr(b"x" * 200)[:200] + "...' sent to parameter 'a' of function 'foo' "\
+                "is of type <class 'bytes'>, expected type <class 'str'>")
+        self.assertEqual(str(e2.exception),
+                "The value '" + "y" * 200 + "...' sent to parameter 'b' of function 'foo' "\
+                "is of type <class 'str'>, expected type <class 'int'>")
+
+    def test_error_args(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            foo("1")
+
+        # Then
+        self.assertEqual(e.exception.args, (str(e.exception),))
+        self.assertEqual(str(TypeError(*e.exception.args)), str(e.exception))
+        self.assertTrue(str(e.exception).startswith("The value '1' sent to parameter 'a'"))
+
+    def test_value_with_large_str(self):
+        # Given
+        class Large:
+            def __str__(self):
+                raise AssertionError("rendered in full")
+
+            def __repr__(self):
+                return "Large()"
+
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        value = Large()
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            foo(value)
+
+        # Then
+        self.assertTrue(str(e.exception).startswith("The value 'Large()' sent to"))
+
+    def test_max_value_length(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        ArgumentTypeError.max_value_length = 3
+        self.addCleanup(setattr, ArgumentTypeError, "max_value_length", 200)
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            foo("12345")
+
+        # Then
+        self.assertTrue(str(e.exception).startswith("The value '123...' sent to"))
+
+    def test_error_does_not_keep_value_alive(self):
+        # Given
+        class Foo:
+            pass
+
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        # When
+        try:
+            foo(Foo())
+        except TypeError as e:
+            error = e
+            error.__traceback__ = None
+
+        # Then
+        self.assertEqual(str(error), "The value '<Foo object>' sent to parameter 'a' "\
+                "of function 'foo' is of type " + str(Foo) + ", expected type <class 'int'>")
+
+class TestFromHints(unittest.TestCase):
+
+    def test_from_hints(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: int, b, c: (str, None) = None, *args: int) -> tuple:
+            return (a, b, c, args)
+
+        # When
+        res = foo(1, 2.0, None, "4")
+
+        with self.assertRaises(TypeError) as e:
+            foo(1, 2.0, 3)
+
+        # Then
+        self.assertEqual(res, (1, 2.0, None, ("4",)))
+        self.assertEqual(str(e.exception), "The value '3' sent to parameter 'c' of function 'foo' "\
+                "is of type <class 'int'>, expected type (<class 'str'>, <class 'NoneType'>)")
+
+    def test_from_hints_return(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: int) -> str:
+            return a
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            foo(1)
+
+        # Then
+        self.assertEqual(e.exception.parameter, None)
+        self.assertEqual(e.exception.expected, str)
+
+    def test_from_hints_typevar(self):
+        # Given
+        T = TypeVar("T")
+        Number = TypeVar("Number", int, float)
+        Text = TypeVar("Text", bound=str)
+
+        @typecheck.from_hints
+        def foo(a: T, b: Number, c: Text) -> T:
+            return a
+
+        # When
+        res = foo([], 1.0, "x")
+
+        with self.assertRaises(TypeError) as number:
+            foo([], "1", "x")
+        with self.assertRaises(TypeError) as text:
+            foo([], 1, b"x")
+
+        # Then
+        self.assertEqual(res, [])
+        self.assertEqual(number.exception.parameter, "b")
+        self.assertEqual(text.exception.parameter, "c")
+
+    def test_from_hints_newtype(self):
+        # Given
+        UserId = NewType("UserId", int)
+        AdminId = NewType("AdminId", UserId)
+
+        @typecheck.from_hints
+        def foo(a: UserId, b: list[AdminId]) -> UserId:
+            return a
+
+        # When
+        res = foo(UserId(1), [AdminId(UserId(2))])
+
+        with self.assertRaises(TypeError) as e:
+            foo(1, ["2"])
+
+        # Then
+        self.assertEqual(res, 1)
+        self.assertEqual(e.exception.parameter, "b")
+
+    def test_from_hints_variadic_not_checked(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: int, *args: int, **kwargs: str):
+            return (a, args, kwargs)
+
+        # When
+        res = foo(1, "2", b=3)
+
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertEqual(res, (1, ("2",), {"b" : 3}))
+        self.assertEqual([name for _, name, *_ in foo.__typecheck_plan__.checks], ["a"])
+
+    def test_from_hints_typeddict(self):
+        # Given
+        class Movie(TypedDict):
+            title: str
+
+        @typecheck.from_hints
+        def foo(a: Movie) -> Movie:
+            return a
+
+        # When
+        res = foo({"title" : "x"})
+
+        with self.assertRaises(TypeError):
+            foo(["x"])
+
+        # Then
+        self.assertEqual(res, {"title" : "x"})
+
+    def test_from_hints_not_a_type(self):
+        # Given
+        def foo(a: 3):
+            pass
+
+        # When
+        with self.assertRaises(TypeCheckError):
+            typecheck.from_hints(foo)
+        with self.assertRaises(TypeCheckError):
+            typecheck(3)(foo)
+
+    def test_from_hints_string_hints(self):
+        # Given
+        @typecheck.from_hints(check_elements="edges")
+        def foo(a: "list[int]", b: "OrderedDict") -> "None":
+            pass
+
+        # When
+        res = foo([1, 2], OrderedDict())
+
+        with self.assertRaises(TypeError):
+            foo(["1"], OrderedDict())
+
+        # Then
+        self.assertIsNone(res)
+
+    def test_from_hints_forward_reference(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: "DefinedLater", b: "list[DefinedLater]") -> "DefinedLater":
+            return a
+
+        # When
+        obj = DefinedLater()
+        res1 = foo(obj, [obj])
+        res2 = hinted_before_definition(obj)
+
+        with self.assertRaises(TypeError):
+            foo(obj, [1])
+
+        with self.assertRaises(TypeError):
+            hinted_before_definition(1)
+
+        # Then
+        self.assertIs(res1, obj)
+        self.assertIs(res2, obj)
+
+    def test_from_hints_unresolved(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: "NoSuchType"):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            foo(1)
+
+        # Then
+        self.assertEqual(str(e.exception), "Could not resolve the type hint 'NoSuchType'")
+
+class TestCoroutines(unittest.TestCase):
+
+    def test_coroutine_function(self):
+        # Given
+        @typecheck(int, check_return_type=str)
+        async def foo(a):
+            await asyncio.sleep(0)
+            return str(a)
+
+        # When
+        res = asyncio.run(foo(1))
+
+        # Then
+        self.assertTrue(inspect.iscoroutinefunction(foo))
+        self.assertEqual(res, "1")
+
+    def test_coroutine_argument_error(self):
+        # Given
+        calls = []
+
+        @typecheck(int)
+        async def foo(a):
+            calls.append(a)
+
+        # When
+        with self.assertRaises(TypeError):
+            asyncio.run(foo("1"))
+
+        # Then
+        self.assertEqual(calls, [])
+
+    def test_coroutine_return_error(self):
+        # Given
+        @typecheck(int, check_return_type=str)
+        async def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeError) as e:
+            asyncio.run(foo(1))
+
+        # Then
+        self.assertEqual(str(e.exception), "The value '1' returned from function 'foo' "\
+                "is of type <class 'int'>, expected type <class 'str'>")
+
+    def test_coroutine_fallback_wrapper(self):
+        # Given
+        @typecheck(int, check_return_type=int)
+        async def foo(_tc_a):
+            return _tc_a
+
+        # When
+        res = asyncio.run(foo(1))
+
+        with self.assertRaises(TypeError):
+            asyncio.run(foo("1"))
+
+        # Then
+        self.assertTrue(inspect.iscoroutinefunction(foo))
+        self.assertEqual(res, 1)
+
+    def test_coroutine_no_checks(self):
+        # Given
+        @typecheck
+        async def foo(a):
+            return a
+
+        # When
+        res = asyncio.run(foo(1))
+
+        # Then
+        self.assertTrue(inspect.iscoroutinefunction(foo))
+        self.assertEqual(res, 1)
+
+class TestGenerators(unittest.TestCase):
+
+    def test_yield_type(self):
+        # Given
+        @typecheck(int, check_yield_type=int)
+        def foo(n):
+            yield from range(n)
+            yield "end"
+
+        # When
+        gen = foo(3)
+        res = [next(gen), next(gen), next(gen)]
+
+        with self.assertRaises(TypeError) as e:
+            next(gen)
+
+        # Then
+        self.assertEqual(res, [0, 1, 2])
+        self.assertIsInstance(gen, Generator)
+        self.assertEqual(str(e.exception), "The value 'end' yielded from function 'foo' "\
+                "is of type <class 'str'>, expected type <class 'int'>")
+
+    def test_yield_arguments_checked_at_call(self):
+        # Given
+        @typecheck(int, check_yield_type=int)
+        def foo(n):
+            yield n
+
+        # When
+        with self.assertRaises(TypeError):
+            foo("1")
+
+    def test_yield_send_throw_close(self):
+        # Given
+        @typecheck(check_yield_type=(int, None))
+        def foo():
+            total = 0
+            try:
+                while True:
+                    value = yield total
+                    total += value
+            except ValueError:
+                yield -1
+            finally:
+                closed.append(True)
+
+        closed = []
+
+        # When
+        gen = foo()
+        res = [next(gen), gen.send(2), gen.send(3), gen.throw(ValueError)]
+        gen.close()
+
+        # Then
+        self.assertEqual(res, [0, 2, 5, -1])
+        self.assertEqual(closed, [True])
+
+    def test_yield_every(self):
+        # Given
+        @typecheck(check_yield_type=int, check_yield_every=2)
+        def foo():
+            yield from [1, "2", 3, "4", "5"]
+
+        # When
+        gen = foo()
+        res = [next(gen) for _ in range(4)]
+
+        with self.assertRaises(TypeError):
+            next(gen)
+
+        # Then
+        self.assertEqual(res, [1, "2", 3, "4"])
+
+    def test_yield_return_value(self):
+        # Given
+        @typecheck(check_yield_type=int)
+        def foo():
+            yield 1
+            return "done"
+
+        # When
+        res = yield_from(foo())
+
+        # Then
+        self.assertEqual(res, ([1], "done"))
+
+    def test_async_yield_type(self):
+        # Given
+        @typecheck(int, check_yield_type=int)
+        async def foo(n):
+            for i in range(n):
+                yield i
+            yield "end"
+
+        async def collect(gen):
+            return [item async for item in gen]
+
+        # When
+        res = asyncio.run(collect(aislice(foo(3), 3)))
+
+        with self.assertRaises(TypeError):
+            asyncio.run(collect(foo(3)))
+
+        # Then
+        self.assertEqual(res, [0, 1, 2])
+        self.assertIsInstance(foo(1), AsyncGenerator)
+
+    def test_yield_needs_generator(self):
+        # Given
+        def foo():
+            return [1]
+
+        # When
+        with self.assertRaises(TypeCheckError):
+            typecheck(check_yield_type=int)(foo)
+
+def yield_from(gen):
+    """ Returns the items and the return value of gen """
+    items = []
+    while True:
+        try:
+            items.append(next(gen))
+        except StopIteration as stop:
+            return items, stop.value
+
+async def aislice(agen, n):
+    for _ in range(n):
+        yield await agen.__anext__()
+
+class TestCheckClass(unittest.TestCase):
+
+    def test_check_class_typing_hints(self):
+        # Given
+        T = TypeVar("T")
+
+        @typecheck.from_hints
+        class Foo:
+            def copy(self) -> Self:
+                return self
+
+            def first(self, values: list[T]) -> T:
+                return values[0]
+
+            def apply(self, f: Callable[[int], int], i: int) -> int:
+                return f(i)
+
+        # When
+        foo = Foo()
+        res = (foo.copy(), foo.first(["a"]), foo.apply(abs, -1))
+
+        with self.assertRaises(TypeError) as e:
+            foo.apply(1, 1)
+
+        # Then
+        self.assertEqual(res, (foo, "a", 1))
+        self.assertEqual(e.exception.parameter, "f")
+
+    def test_check_class(self):
+        # Given
+        @typecheck.from_hints
+        class Foo:
+            def __init__(self, i: int):
+                self._i = i
+
+            def bar(self, j: int) -> int:
+                return self._i + j
+
+            def unchecked(self, j):
+                return j
+
+            @classmethod
+            def baz(cls, s: str) -> "Foo":
+                return cls(len(s))
+
+            @staticmethod
+            def faz(f: float) -> float:
+                return f
+
+            @property
+            def i(self) -> int:
+                return self._i
+
+            @i.setter
+            def i(self, value: int):
+                self._i = value
+
+        # When
+        foo = Foo(1)
+        res = (foo.bar(2), Foo.baz("ab").i, foo.faz(1.5), foo.unchecked("x"))
+        foo.i = 5
+
+        for call in (lambda: Foo("1"), lambda: foo.bar("2"), lambda: Foo.baz(1),
+                     lambda: Foo.faz(1), lambda: setattr(foo, "i", "6")):
+            with self.assertRaises(TypeError):
+                call()
+
+        # Then
+        self.assertEqual(res, (3, 2, 1.5, "x"))
+        self.assertEqual(foo.i, 5)
+
+    def test_class_summary(self):
+        # Given
+        @typecheck.from_hints(check_every=1)
+        class Foo:
+            def bar(self, a: int, b: str) -> int:
+                return a
+
+            @property
+            def baz(self) -> int:
+                return 1
+
+            def unchecked(self, a):
+                return a
+
+        # When
+        summary = typecheck.class_summary(Foo)
+
+        # Then
+        self.assertEqual(summary["checks"], 4)
+        self.assertEqual({name : (method["kind"], method["checks"])
+                          for name, method in summary["methods"].items()},
+                         {"bar" : ("instance", 3), "baz" : ("property", 1)})
+        self.assertGreater(summary["compile_ns"], 0)
+
+    def test_check_class_keeps_decorated(self):
+        # Given
+        @typecheck.from_hints
+        class Foo:
+            @typecheck(a=str)
+            def bar(self, a: int):
+                return a
+
+        # When
+        res = Foo().bar("1")
+
+        # Then
+        self.assertEqual(res, "1")
+        self.assertEqual(typecheck.class_summary(Foo)["methods"], {})
+
+class TestStats(unittest.TestCase):
+
+    def tearDown(self):
+        typecheck.set_stats(False)
+        typecheck.set_sampling()
+
+    def test_check_stats(self):
+        # Given
+        @typecheck(int, str, check_return_type=int, check_stats=True)
+        def foo(a, b):
+            return a
+
+        # When
+        foo(1, "2")
+        foo(2, "3")
+        with self.assertRaises(TypeError):
+            foo(1, 2)
+
+        stats = typecheck.stats_snapshot()[foo.__module__ + "." + foo.__qualname__]
+
+        # Then
+        self.assertEqual((stats["calls"], stats["checked"], stats["checks"]), (3, 2, 6))
+        self.assertEqual(stats["failures"], {"b" : 1})
+        self.assertGreater(stats["check_ns"], 0)
+        self.assertGreater(stats["call_ns"], 0)
+
+    def test_stats_fallback_wrapper(self):
+        # Given
+        @typecheck(int, check_return_type=str, check_stats=True)
+        def foo(_tc_a):
+            return _tc_a
+
+        # When
+        with self.assertRaises(TypeError):
+            foo(1)
+
+        stats = typecheck.stats_snapshot()[foo.__module__ + "." + foo.__qualname__]
+
+        # Then
+        self.assertEqual((stats["calls"], stats["checked"]), (1, 1))
+        self.assertEqual(stats["failures"], {"return" : 1})
+
+    def test_set_stats_at_runtime(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        name = foo.__module__ + "." + foo.__qualname__
+
+        # When
+        foo(1)
+        before = name in typecheck.stats_snapshot()
+
+        typecheck.set_stats(True)
+        foo(1)
+        typecheck.set_sampling(every=2, func=foo)
+        foo(1)
+        foo(1)
+        stats = typecheck.stats_snapshot()[name]
+
+        typecheck.set_stats(False)
+        foo(1)
+        after = name in typecheck.stats_snapshot()
+
+        # Then
+        self.assertFalse(before)
+        self.assertEqual((stats["calls"], stats["checked"]), (3, 2))
+        self.assertFalse(after)
+
+    def test_reset_and_dump_stats(self):
+        # Given
+        @typecheck(int, check_stats=True)
+        def foo(a):
+            return a
+
+        name = foo.__module__ + "." + foo.__qualname__
+        foo(1)
+
+        # When
+        typecheck.reset_stats()
+        foo(2)
+        out = io.StringIO()
+        text = typecheck.dump_stats(out)
+
+        # Then
+        self.assertEqual(json.loads(text)[name]["calls"], 1)
+        self.assertEqual(out.getvalue(), text)
+
+class TestModes(unittest.TestCase):
+
+    def tearDown(self):
+        typecheck.set_mode("raise", interval=60.0)
+
+    def test_hook_mode(self):
+        # Given
+        reports = []
+
+        @typecheck(int, check_return_type=int, check_mode=lambda e, n: reports.append((e, n)))
+        def foo(a):
+            return a
+
+        # When
+        res = foo("1")
+
+        # Then
+        self.assertEqual(res, "1")
+        self.assertEqual([(e.parameter, e.actual, n) for e, n in reports], [("a", str, 0), (None, str, 0)])
+        self.assertIsInstance(reports[0][0], ArgumentTypeError)
+
+    def test_reports_deduplicated_and_rate_limited(self):
+        # Given
+        reports = []
+
+        @typecheck(int, check_mode=lambda e, n: reports.append((e.actual, n)))
+        def foo(a):
+            return a
+
+        # When
+        for _ in range(1000):
+            foo("1")
+        foo(1.0)
+        typecheck.set_mode(interval=0)
+        foo("1")
+
+        # Then
+        self.assertEqual(reports, [(str, 0), (float, 0), (str, 999)])
+
+    def test_log_mode(self):
+        # Given
+        @typecheck(int, check_mode="log")
+        def foo(a):
+            return a
+
+        # When
+        with self.assertLogs("typechecker", level="WARNING") as logs:
+            res = foo("1")
+            foo("1")
+
+        # Then
+        self.assertEqual(res, "1")
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("sent to parameter 'a' of function 'foo'", logs.output[0])
+
+    def test_set_mode_global_and_per_function(self):
+        # Given
+        reports = []
+
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        @typecheck(int, check_mode="raise")
+        def bar(a):
+            return a
+
+        # When
+        typecheck.set_mode(lambda e, n: reports.append(e.function))
+        foo("1")
+        with self.assertRaises(TypeError):
+            bar("1")
+        typecheck.set_mode("raise", func=foo)
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertEqual(reports, ["foo"])
+
+    def test_set_interval_per_function(self):
+        # Given
+        reports = []
+
+        @typecheck(int, check_mode=lambda e, n: reports.append(e.function))
+        def foo(a):
+            return a
+
+        @typecheck(int, check_mode=lambda e, n: reports.append(e.function))
+        def bar(a):
+            return a
+
+        # When
+        typecheck.set_mode(interval=0, func=foo)
+        for _ in range(3):
+            foo("1")
+            bar("1")
+
+        # Then
+        self.assertEqual(reports, ["foo", "bar", "foo", "foo"])
+
+    def test_generator_mode(self):
+        # Given
+        reports = []
+
+        @typecheck(check_yield_type=int, check_mode=lambda e, n: reports.append(e.yielded))
+        def foo():
+            yield 1
+            yield "2"
+            yield 3
+
+        # When
+        res = list(foo())
+
+        # Then
+        self.assertEqual(res, [1, "2", 3])
+        self.assertEqual(reports, [True])
+
+    def test_bad_mode(self):
+        # Given
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError):
+            typecheck(int, check_mode="warn")(foo)
+
+@runtime_checkable
+class Closer(Protocol):
+    def close(self): ...
+
+@runtime_checkable
+class Named(Protocol):
+    name: str
+
+class TestVerdictCache(unittest.TestCase):
+
+    def test_abc_and_protocol(self):
+        # Given
+        class File:
+            def close(self):
+                pass
+
+        @typecheck(Iterable, Closer, check_return_type=Sized)
+        def foo(a, b):
+            return a
+
+        # When
+        res = [foo([1], File()), foo((2,), File())]
+
+        with self.assertRaises(TypeError):
+            foo(1, File())
+
+        with self.assertRaises(TypeError):
+            foo([1], object())
+
+        # Then
+        self.assertEqual(res, [[1], (2,)])
+        verdicts = foo.__typecheck_plan__.checks[0][3].__self__.verdicts
+        self.assertEqual(set(verdicts), {id(list), id(tuple)})
+
+    def test_registered_later(self):
+        # Given
+        class Foo:
+            pass
+
+        class Base(metaclass=ABCMeta):
+            pass
+
+        @typecheck(Base)
+        def foo(a):
+            return a
+
+        with self.assertRaises(TypeError):
+            foo(Foo())
+
+        # When
+        Base.register(Foo)
+        res = foo(Foo())
+
+        # Then
+        self.assertIsInstance(res, Foo)
+
+    def test_types_are_not_kept_alive(self):
+        # Given
+        class Closing(Protocol): # Not shared with the other tests
+            def close(self): ...
+
+        @typecheck(Closing)
+        def foo(a):
+            return a
+
+        verdicts = foo.__typecheck_plan__.checks[0][3].__self__.verdicts
+        cls = type("File", (), {"close": lambda self: None})
+        foo(cls())
+
+        # When
+        self.assertEqual(len(verdicts), 1)
+        del cls
+        gc.collect()
+
+        # Then
+        self.assertEqual(len(verdicts), 0)
+
+    def test_data_protocols_not_cached(self):
+        # Given
+        class Foo:
+            pass
+
+        @typecheck(Named)
+        def foo(a):
+            return a
+
+        named, unnamed = Foo(), Foo()
+        named.name = "foo"
+
+        # When
+        res = foo(named)
+
+        with self.assertRaises(TypeError):
+            foo(unnamed)
+
+        # Then
+        self.assertIs(res, named)
+        self.assertEqual(foo.__typecheck_plan__.checks[0][3].__self__.verdicts, {})
+
+    def test_cache_bounded(self):
+        # Given
+        @typecheck(Closer)
+        def foo(a):
+            return a
+
+        verdicts = foo.__typecheck_plan__.checks[0][3].__self__.verdicts
+        classes = [type(f"File{i}", (), {"close": lambda self: None}) for i in range(100)]
+
+        # When
+        for cls in classes:
+            foo(cls())
+
+        # Then
+        self.assertLessEqual(len(verdicts), 64)
+
+class TestThreads(unittest.TestCase):
+
+    THREADS = 8
+    CALLS = 2000
+
+    def tearDown(self):
+        typecheck.set_stats(False)
+        typecheck.set_sampling(None)
+
+    def hammer(self, call, calls=CALLS):
+        """ Runs call(i) calls times in each of THREADS threads started
+            together, and returns the results of all the calls.
+        """
+        barrier = threading.Barrier(self.THREADS)
+
+        def work(_):
+            barrier.wait()
+            return [call(i) for i in range(calls)]
+
+        with ThreadPoolExecutor(self.THREADS) as pool:
+            return [res for results in pool.map(work, range(self.THREADS)) for res in results]
+
+    def test_lazy_checks_and_caches(self):
+        # Given
+        class File:
+            def close(self):
+                pass
+
+        @typecheck.from_hints
+        def foo(a: "LaterThread", b: list[int], c: Closer) -> int:
+            return len(b)
+
+        @typecheck("float", check_yield_type=int)
+        def gen(a):
+            yield 1
+            yield "2"
+
+        classes = [type(f"File{i}", (File,), {}) for i in range(100)]
+
+        def call(i):
+            res = foo(LaterThread(), [i, i], classes[i % 100]())
+            try:
+                list(gen(1.0 if i % 2 else 1))
+            except TypeError:
+                res += 1
+            return res
+
+        # When
+        res = self.hammer(call)
+
+        # Then
+        self.assertEqual(res, [3] * (self.THREADS * self.CALLS))
+
+    def test_settings_changed_during_calls(self):
+        # Given
+        @typecheck(int, check_return_type=int)
+        def foo(a):
+            return a
+
+        done = threading.Event()
+
+        def toggle():
+            on = False
+            while not done.is_set():
+                on = not on
+                typecheck.set_stats(on)
+                typecheck.set_sampling(every=2 if on else None)
+                typecheck.stats_snapshot()
+
+        def call(i):
+            try:
+                foo(str(i) if i % 3 == 0 else i)
+            except TypeError:
+                return "fail"
+            return "pass"
+
+        # When
+        toggler = threading.Thread(target=toggle)
+        toggler.start()
+        try:
+            res = self.hammer(call)
+        finally:
+            done.set()
+            toggler.join()
+
+        # Then
+        self.assertEqual(set(res), {"pass", "fail"})
+
+    def test_decorating_during_snapshots(self):
+        # Given
+        def decorate(i):
+            @typecheck(int, check_stats=True)
+            def foo(a):
+                return a
+            return foo(i) + len(typecheck.stats_snapshot()) * 0
+
+        # When
+        res = self.hammer(decorate, calls=100)
+
+        # Then
+        self.assertEqual(sorted(res), sorted(list(range(100)) * self.THREADS))
+
+class LaterThread:
+    pass
+
+@typecheck(int, check_return_type=int)
+def pool_square(a):
+    return a * a
+
+class TestPickle(unittest.TestCase):
+
+    def roundtrip(self, obj):
+        return pickle.loads(pickle.dumps(obj))
+
+    def test_decorated_function(self):
+        # When
+        res = self.roundtrip(pool_square)
+
+        # Then
+        self.assertIs(res, pool_square)
+
+    def test_plan_built_on_first_call(self):
+        # Given
+        @typecheck(int)
+        def foo(a, b=2):
+            return a + b
+
+        plan = foo.__typecheck_plan__
+        self.assertNotIn("_tc_func", plan.namespace)
+
+        # When
+        res = [foo(1), foo(1, b=3)]
+
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertEqual(res, [3, 4])
+        self.assertIn("_tc_func", plan.namespace)
+        self.assertEqual(foo.__code__.co_varnames[:2], ("a", "b"))
+
+    def test_specs(self):
+        # Given
+        class File:
+            def close(self):
+                pass
+
+        @typecheck(list[int], tuple[int, str], (int, "str", list[int]), Closer)
+        def foo(a, b, c, d):
+            return a
+
+        foo([1], (1, "2"), "3", File()) # Fill the caches
+        specs = [test.__self__ for _, _, _, test in foo.__typecheck_plan__.checks]
+
+        # When
+        res = [self.roundtrip(spec) for spec in specs]
+
+        # Then
+        self.assertEqual([str(spec) for spec in res], [str(spec) for spec in specs])
+        self.assertEqual([spec.check(value) for spec, value in zip(res, ([1], (1, "2"), "3", File()))],
+                         [True] * 4)
+        self.assertEqual([spec.check(value) for spec, value in zip(res, (["1"], (1, 2), 3.0, 1))],
+                         [False] * 4)
+
+    def test_hint_spec(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: "LaterThread"):
+            return a
+
+        spec = foo.__typecheck_plan__.checks[0][2]
+
+        # When
+        res = self.roundtrip(spec)
+
+        # Then
+        self.assertIs(res, LaterThread)
+
+    def test_errors(self):
+        # Given
+        with self.assertRaises(ArgumentTypeError) as e:
+            pool_square("x" * 300)
+
+        # When
+        res = self.roundtrip(e.exception)
+        missing = self.roundtrip(TypeCheckError("Missing", "foo", "a"))
+
+        # Then
+        self.assertEqual(str(res), str(e.exception))
+        self.assertEqual((res.function, res.parameter, res.expected, res.actual),
+                         ("pool_square", "a", int, str))
+        self.assertEqual((str(missing), missing.function, missing.parameter), ("Missing", "foo", "a"))
+
+    def test_process_pool(self):
+        # Given
+        context = multiprocessing.get_context("spawn")
+
+        # When
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            res = list(pool.map(pool_square, [1, 2, 3]))
+            with self.assertRaises(ArgumentTypeError) as e:
+                pool.submit(pool_square, 1.5).result()
+
+        # Then
+        self.assertEqual(res, [1, 4, 9])
+        self.assertEqual((e.exception.parameter, e.exception.actual), ("a", float))
+
+class TestImportTime(unittest.TestCase):
+
+    # Modules that typechecker imports only when a feature needs them
+    LAZY_MODULES = ("inspect", "random", "threading", "importlib", "pydoc",
+                    "typing", "json", "logging", "numpy")
+    BUDGET_US = 10000
+
+    def run_python(self, code, *options, env=None):
+        return subprocess.run([sys.executable, *options, "-c", code], capture_output=True,
+                              text=True, check=True, env=env,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def test_heavy_modules_not_imported(self):
+        # Given
+        code = "import sys\n"\
+               "before = set(sys.modules)\n"\
+               "import typechecker\n"\
+               "@typechecker.typecheck(int, check_return_type=int)\n"\
+               "def foo(a, *args, b=1, **kwargs):\n"\
+               "    return a\n"\
+               "foo(1)\n"\
+               "print(' '.join(sorted(set(sys.modules) - before)))"
+
+        # When
+        res = self.run_python(code).stdout.split()
+
+        # Then
+        self.assertEqual([name for name in self.LAZY_MODULES if name in res], [])
+
+    def test_import_time_budget(self):
+        # Given
+        env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+
+        # When
+        with tempfile.TemporaryDirectory() as cache:
+            self.run_python("import typechecker", "-X", f"pycache_prefix={cache}", env=env)
+            times = []
+            for _ in range(3):
+                stderr = self.run_python("import typechecker", "-X", "importtime",
+                                         "-X", f"pycache_prefix={cache}", env=env).stderr
+                line = [line for line in stderr.splitlines() if line.endswith("| typechecker")][0]
+                times.append(int(line.split("|")[1]))
+
+        # Then
+        self.assertLess(min(times), self.BUDGET_US)
+
+class Reader(Protocol): # Not runtime_checkable
+    def read(self): ...
+    def close(self): ...
+
+class TestStructural(unittest.TestCase):
+
+    def test_attribute_spec(self):
+        # Given
+        class File:
+            def read(self):
+                return "data"
+
+            def close(self):
+                pass
+
+        class Socket:
+            def read(self):
+                return "data"
+
+        @typecheck(AttributeSpec("read", "close"))
+        def foo(f):
+            return f.read()
+
+        # When
+        res = [foo(File()), foo(io.StringIO("data"))]
+
+        with self.assertRaises(TypeError) as e:
+            foo(Socket())
+
+        # Then
+        self.assertEqual(res, ["data", "data"])
+        self.assertIn("expected type AttributeSpec('read', 'close')", str(e.exception))
+
+    def test_generic_protocol(self):
+        # Given
+        T = TypeVar("T")
+
+        class Box(Protocol[T]): # Not runtime_checkable
+            def get(self) -> T: ...
+
+        class IntBox:
+            def get(self):
+                return 1
+
+        @typecheck.from_hints
+        def foo(box: Box[int]) -> int:
+            return box.get()
+
+        # When
+        res = foo(IntBox())
+
+        with self.assertRaises(TypeError):
+            foo(1)
+
+        # Then
+        self.assertEqual(res, 1)
+
+    def test_protocol(self):
+        # Given
+        class File:
+            def read(self):
+                return "data"
+
+            def close(self):
+                pass
+
+        @typecheck.from_hints
+        def foo(f: Reader) -> str:
+            return f.read()
+
+        # When
+        res = foo(File())
+
+        with self.assertRaises(TypeError) as e:
+            foo("data")
+
+        # Then
+        self.assertEqual(res, "data")
+        self.assertIn(f"expected type {Reader}", str(e.exception))
+
+    def test_verdict_per_class(self):
+        # Given
+        class File:
+            def read(self):
+                pass
+
+            def close(self):
+                pass
+
+        spec = AttributeSpec("read", "close")
+
+        # When
+        res = [spec.check(File()), spec.check(File())]
+
+        # Then
+        self.assertEqual(res, [True, True])
+        self.assertEqual(list(spec.verdicts), [id(File)])
+
+    def test_class_mutated(self):
+        # Given
+        class File:
+            def read(self):
+                pass
+
+        spec = AttributeSpec("read", "close")
+        before = spec.check(File())
+
+        # When
+        File.close = lambda self: None
+        after = spec.check(File())
+
+        # Then
+        self.assertEqual((before, after), (False, True))
+
+    def test_instance_attributes(self):
+        # Given
+        class File:
+            def __init__(self, closable):
+                if closable:
+                    self.close = lambda: None
+
+            def read(self):
+                pass
+
+        spec = AttributeSpec("read", "close")
+
+        # When
+        res = [spec.check(File(True)), spec.check(File(False))]
+
+        # Then
+        self.assertEqual(res, [True, False])
+        self.assertEqual(spec.verdicts, {})
+
+    def test_method_set_to_none(self):
+        # Given
+        class Unhashable:
+            __hash__ = None
+
+        spec = AttributeSpec("__hash__")
+
+        # When
+        res = [spec.check(1), spec.check(Unhashable())]
+
+        # Then
+        self.assertEqual(res, [True, False])
+
+    def test_bad_attribute_spec(self):
+        # When
+        with self.assertRaises(TypeCheckError):
+            AttributeSpec()
+
+        with self.assertRaises(TypeCheckError):
+            AttributeSpec("read", 1)
+
+    def test_pickle(self):
+        # Given
+        specs = [AttributeSpec("read", "close"), AttributeSpec.from_protocol(Reader)]
+
+        # When
+        res = [pickle.loads(pickle.dumps(spec)) for spec in specs]
+
+        # Then
+        self.assertEqual([str(spec) for spec in res], [str(spec) for spec in specs])
+        self.assertEqual(res[1].names, ("close", "read"))
+
+@typecheck.record(check_setattr=True, slots=True)
+class Point:
+    x: int
+    y: int = 0
+    label: "str | LaterRecord" = ""
+
+class LaterRecord:
+    pass
+
+class TestRecord(unittest.TestCase):
+
+    def test_plain_class(self):
+        # Given
+        @typecheck.record
+        class Foo:
+            a: int
+            b: (str, None) = None
+
+        # When
+        res = [vars(Foo(1)), vars(Foo(1, "b")), vars(Foo(b=None, a=2))]
+
+        with self.assertRaises(TypeError) as e:
+            Foo("1")
+
+        with self.assertRaises(TypeCheckError):
+            Foo()
+
+        # Then
+        self.assertEqual(res, [{"a" : 1, "b" : None}, {"a" : 1, "b" : "b"}, {"a" : 2, "b" : None}])
+        self.assertIn("sent to parameter 'a' of function '__init__'", str(e.exception))
+
+    def test_setattr(self):
+        # Given
+        @typecheck.record(check_setattr=True)
+        class Foo:
+            a: int
+
+        foo = Foo(1)
+
+        # When
+        foo.a = 2
+        foo.other = "other"
+
+        with self.assertRaises(TypeError) as e:
+            foo.a = "3"
+
+        # Then
+        self.assertEqual(vars(foo), {"a" : 2, "other" : "other"})
+        self.assertIn("sent to parameter 'a' of function '__setattr__'", str(e.exception))
+
+    def test_slots(self):
+        # When
+        point = Point(1, label="p")
+
+        with self.assertRaises(AttributeError):
+            point.z = 1
+
+        with self.assertRaises(TypeError):
+            point.y = 1.5
+
+        # Then
+        self.assertFalse(hasattr(point, "__dict__"))
+        self.assertEqual((point.x, point.y, point.label), (1, 0, "p"))
+        self.assertEqual(Point.__slots__, ("x", "y", "label"))
+
+    def test_slots_super(self):
+        # Given
+        class Base:
+            def describe(self):
+                return "base"
+
+        @typecheck.record(slots=True)
+        class Foo(Base):
+            a: int
+
+            def describe(self):
+                return f"foo of {super().describe()}"
+
+            @property
+            def size(self):
+                return super().__sizeof__()
+
+            @classmethod
+            def make(cls):
+                return super().__new__(cls)
+
+        # When
+        foo = Foo(1)
+
+        # Then
+        self.assertEqual(foo.describe(), "foo of base")
+        self.assertGreater(foo.size, 0)
+        self.assertIsInstance(Foo.make(), Foo)
+        self.assertEqual(Foo.__qualname__, f"{type(self).__qualname__}.test_slots_super.<locals>.Foo")
+
+    def test_forward_reference(self):
+        # When
+        point = Point(1, label=LaterRecord())
+
+        with self.assertRaises(TypeError):
+            Point(1, label=1)
+
+        # Then
+        self.assertIsInstance(point.label, LaterRecord)
+
+    def test_dataclass(self):
+        # Given
+        @typecheck.record
+        @dataclass
+        class Foo:
+            a: int
+            tags: list[str] = field(default_factory=list)
+            total: int = field(init=False, default=0)
+            b: float = field(default=1.0, kw_only=True)
+
+            def __post_init__(self):
+                self.total = self.a + len(self.tags)
+
+        # When
+        foo = Foo(1, ["x"], b=2.0)
+
+        with self.assertRaises(TypeError):
+            Foo(1, [1])
+
+        with self.assertRaises(TypeError):
+            Foo(1, b=2)
+
+        # Then
+        self.assertTrue(repr(foo).endswith("Foo(a=1, tags=['x'], total=2, b=2.0)"))
+        self.assertEqual(Foo(1).tags, [])
+        self.assertIsNot(Foo(1).tags, Foo(1).tags)
+
+    def test_frozen_dataclass_with_slots(self):
+        # Given
+        @typecheck.record
+        @dataclass(frozen=True, slots=True)
+        class Foo:
+            a: int
+
+        # When
+        foo = Foo(1)
+
+        with self.assertRaises(TypeError):
+            Foo("1")
+
+        # Then
+        self.assertEqual(foo.a, 1)
+        self.assertFalse(hasattr(foo, "__dict__"))
+
+    def test_options(self):
+        # Given
+        reports = []
+
+        @typecheck.record(check_setattr=True, check_mode=lambda e, n: reports.append(e.function))
+        class Foo:
+            a: int
+
+        # When
+        foo = Foo("1")
+        foo.a = "2"
+
+        # Then
+        self.assertEqual(foo.a, "2")
+        self.assertEqual(reports, ["__init__", "__setattr__"])
+
+    def test_pickle(self):
+        # Given
+        point = Point(1, 2, "p")
+
+        # When
+        res = pickle.loads(pickle.dumps(point))
+
+        # Then
+        self.assertEqual((res.x, res.y, res.label), (1, 2, "p"))
+
+    def test_bad_records(self):
+        # Given
+        class DefaultOrder:
+            a: int = 1
+            b: int
+
+        @dataclass
+        class WithInitVar:
+            a: InitVar[int]
+
+        @dataclass
+        class Plain:
+            a: int
+
+        @dataclass(frozen=True)
+        class Frozen:
+            a: int
+
+        # When
+        for cls, options in ((DefaultOrder, {}), (WithInitVar, {}), (Plain, {"slots" : True}),
+                             (Frozen, {"check_setattr" : True})):
+            with self.assertRaises(TypeCheckError):
+                typecheck.record(cls, **options)
+
+class DefinedLater:
+    pass
+
+class TestSharedPlans(unittest.TestCase):
+    def test_equal_signatures_share_checks(self):
+        # Given
+        @typecheck(int, b=str)
+        def foo(a, b):
+            return ("foo", a, b)
+
+        @typecheck(int, b=str)
+        def bar(a, b):
+            return ("bar", a, b)
+
+        # When
+        res = [foo(1, "a"), bar(2, "b")]
+
+        with self.assertRaises(TypeError):
+            bar(2, 3)
+
+        # Then
+        self.assertEqual(res, [("foo", 1, "a"), ("bar", 2, "b")])
+        self.assertIs(foo.__typecheck_plan__.layout, bar.__typecheck_plan__.layout)
+        self.assertIs(foo.__code__, bar.__code__)
+
+    def test_defaults_are_not_shared(self):
+        # Given
+        @typecheck(int, int)
+        def foo(a, b=1):
+            return (a, b)
+
+        @typecheck(int, int)
+        def bar(a, b=2):
+            return (a, b)
+
+        # When
+        res = [foo(0), bar(0), foo(0, 3)]
+
+        # Then
+        self.assertEqual(res, [(0, 1), (0, 2), (0, 3)])
+        self.assertIs(foo.__typecheck_plan__.layout, bar.__typecheck_plan__.layout)
+
+    def test_different_checks_not_shared(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        @typecheck(str)
+        def bar(a):
+            return a
+
+        # When
+        res = [foo(1), bar("1")]
+
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        with self.assertRaises(TypeError):
+            bar(1)
+
+        # Then
+        self.assertEqual(res, [1, "1"])
+        self.assertIsNot(foo.__typecheck_plan__.layout, bar.__typecheck_plan__.layout)
+
+    def test_unhashable_specs(self):
+        # Given
+        @typecheck(list[int], check_elements=["edges", 2])
+        def foo(a):
+            return a
+
+        @typecheck(list[int], check_elements=["edges", 2])
+        def bar(a):
+            return a
+
+        # When
+        res = [foo([1, 2]), bar([3])]
+
+        with self.assertRaises(TypeError):
+            bar(["3"])
+
+        # Then
+        self.assertEqual(res, [[1, 2], [3]])
+        self.assertIsNot(foo.__typecheck_plan__.layout, bar.__typecheck_plan__.layout)
+
+    def test_layouts_released(self):
+        # Given
+        class Foo:
+            pass
+
+        @typecheck(Foo, "pass", "pass")
+        def foo(a, b, c):
+            return a
+
+        layout = weakref.ref(foo.__typecheck_plan__.layout)
+
+        # When
+        del foo
+        gc.collect()
+
+        # Then
+        self.assertIsNone(layout())
+
+    def test_plans_have_no_dict(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        # When
+        plan = foo.__typecheck_plan__
+
+        # Then
+        self.assertFalse(hasattr(plan, "__dict__"))
+
+def in_module(module):
+    """ Returns a function foo(a) that claims to be in module """
+    def foo(a):
+        return a
+    foo.__module__ = module
+    return foo
+
+class TestDisable(unittest.TestCase):
+    def tearDown(self):
+        typecheck.set_disabled()
+
+    def run_python(self, code, *options, disable=None):
+        env = {key: value for key, value in os.environ.items() if key != "TYPECHECK_DISABLE"}
+        if disable is not None:
+            env["TYPECHECK_DISABLE"] = disable
+        return subprocess.run([sys.executable, *options, "-c", code], capture_output=True,
+                              text=True, check=True, env=env,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+
+    def test_disabled_module(self):
+        # Given
+        def foo(a):
+            return a
+
+        typecheck.set_disabled(__name__)
+
+        # When
+        res = typecheck(int)(foo)
+
+        # Then
+        self.assertIs(res, foo)
+        self.assertEqual(res("1"), "1")
+        self.assertIn(f"{__name__}.{foo.__qualname__}", typecheck.checked_functions()["stripped"])
+
+    def test_stripped_closures_recorded_once(self):
+        # Given
+        typecheck.set_disabled(__name__)
+
+        # When
+        for _ in range(100):
+            @typecheck(int)
+            def closure(a):
+                return a
+
+        # Then
+        stripped = typecheck.checked_functions()["stripped"]
+        self.assertEqual(stripped.count(f"{__name__}.{closure.__qualname__}"), 1)
+
+    def test_patterns(self):
+        # Given
+        typecheck.set_disabled("app", "lib.*_fast", "tools.cli")
+
+        # When
+        res = {}
+        for module in ("app", "app.views", "apps", "lib.io_fast", "lib.io", "tools", "tools.cli.main"):
+            foo = in_module(module)
+            res[module] = typecheck(int)(foo) is foo
+
+        # Then
+        self.assertEqual(res, {"app" : True, "app.views" : True, "apps" : False,
+                               "lib.io_fast" : True, "lib.io" : False,
+                               "tools" : False, "tools.cli.main" : True})
+
+    def test_other_modules_checked(self):
+        # Given
+        typecheck.set_disabled("app")
+
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertIn(f"{__name__}.{foo.__qualname__}", typecheck.checked_functions()["checked"])
+
+    def test_decorators(self):
+        # Given
+        typecheck.set_disabled(__name__)
+
+        def foo(a: int) -> int:
+            return a
+
+        class Foo:
+            def bar(self, a: int):
+                return a
+
+        class Point:
+            x: int
+            y: int = 0
+
+        # When
+        res = [typecheck(foo), typecheck.from_hints(foo), typecheck(int)(foo)]
+        cls = typecheck.from_hints(Foo)
+        record = typecheck.record(check_setattr=True)(Point)
+        point = record("1")
+        point.y = "2"
+
+        # Then
+        self.assertEqual(res, [foo, foo, foo])
+        self.assertEqual(cls.bar(None, "1"), "1")
+        self.assertEqual(typecheck.class_summary(cls)["checks"], 0)
+        self.assertEqual((point.x, point.y), ("1", "2"))
+
+    def test_environment(self):
+        # Given
+        code = "from typechecker import typecheck\n"\
+               "def foo(a):\n"\
+               "    return a\n"\
+               "print(typecheck(int)(foo) is foo)"
+
+        # When
+        res = [self.run_python(code),
+               self.run_python(code, disable="__main__"),
+               self.run_python(code, disable="other, __mai*"),
+               self.run_python(code, disable="other")]
+
+        # Then
+        self.assertEqual(res, ["False", "True", "True", "False"])
+
+    def test_optimize(self):
+        # Given
+        code = "from typechecker import typecheck\n"\
+               "def foo(a):\n"\
+               "    return a\n"\
+               "print(typecheck(int)(foo) is foo)"
+
+        # When
+        res = [self.run_python(code, "-O"),
+               self.run_python(code, "-O", disable=""),
+               self.run_python(code, "-O", disable="other")]
+
+        # Then
+        self.assertEqual(res, ["True", "False", "False"])
+
+class TestObserve(unittest.TestCase):
+    def test_observe(self):
+        # Given
+        @typecheck.observe(every=1)
+        def foo(a, b=None, *args, c=1):
+            return a if b is None else None
+
+        name = f"{foo.__module__}.{foo.__qualname__}"
+
+        # When
+        res = [foo(1), foo("1", 2), foo(1, c=2.0), foo([1], None, 3)]
+
+        # Then
+        self.assertEqual(res, [1, None, 1, [1]])
+        self.assertEqual(typecheck.observed()[name], {
+            "calls" : 4,
+            "params" : {"a" : {"int" : 2, "str" : 1, "list" : 1}, "b" : {"int" : 1, "None" : 1},
+                        "c" : {"float" : 1}},
+            "return" : {"int" : 2, "list" : 1, "None" : 1},
+        })
+
+    def test_sampled(self):
+        # Given
+        @typecheck.observe
+        def foo(a):
+            return a
+
+        @typecheck.observe(every=10)
+        def bar(a):
+            return a
+
+        # When
+        for i in range(1000):
+            foo(i)
+            bar(i)
+
+        # Then
+        observed = typecheck.observed()
+        self.assertEqual(observed[f"{foo.__module__}.{foo.__qualname__}"]["calls"], 10)
+        self.assertEqual(observed[f"{bar.__module__}.{bar.__qualname__}"]["calls"], 100)
+
+    def test_bounded(self):
+        # Given
+        @typecheck.observe(every=1)
+        def foo(a):
+            return None
+
+        classes = [type(f"Foo{i}", (), {}) for i in range(20)]
+
+        # When
+        for cls in classes:
+            foo(cls())
+
+        # Then
+        counts = typecheck.observed()[f"{foo.__module__}.{foo.__qualname__}"]["params"]["a"]
+        self.assertEqual(len(counts), 9)
+        self.assertEqual(counts["other"], 12)
+
+    def test_suggest_specs(self):
+        # Given
+        class Foo:
+            @typecheck.observe(every=1)
+            def observed_method(self, a, b, c=None):
+                return (a, b)
+
+        file = io.StringIO()
+
+        # When
+        for value in (1, "1", 2):
+            Foo().observed_method(value, None)
+
+        typecheck.suggest_specs(file)
+
+        # Then
+        lines = file.getvalue().splitlines()
+        index = lines.index(f"# {Foo.__module__}.{Foo.observed_method.__qualname__}: 3 calls observed")
+        self.assertEqual(lines[index + 1],
+                         "@typecheck('pass', (int, str), None, 'pass', check_return_type=tuple)")
+
+    def test_suggested_names(self):
+        # Given
+        @typecheck.observe(every=1)
+        def foo(a):
+            return a
+
+        # When
+        foo(OrderedDict())
+        text = typecheck.suggest_specs()
+
+        # Then
+        self.assertIn("@typecheck('collections.OrderedDict', "
+                      "check_return_type='collections.OrderedDict')\n", text)
+
+    def test_generators(self):
+        # Given
+        @typecheck.observe(every=1)
+        def foo(n):
+            yield from range(n)
+
+        # When
+        res = list(foo(3))
+        text = typecheck.suggest_specs()
+
+        # Then
+        self.assertEqual(res, [0, 1, 2])
+        self.assertIn(f"# {foo.__module__}.{foo.__qualname__}: 1 calls observed\n@typecheck(int)\n", text)
+
+class TestTyping(unittest.TestCase):
+    def test_unions(self):
+        # Given
+        @typecheck(Optional[int], int | None, Union[int, str, None])
+        def foo(a, b, c):
+            return (a, b, c)
+
+        # When
+        res = [foo(None, 1, "1"), foo(1, None, None)]
+
+        for args in (("1", 1, 1), (1, 1.0, 1), (1, 1, 1.0)):
+            with self.assertRaises(TypeError):
+                foo(*args)
+
+        # Then
+        self.assertEqual(res, [(None, 1, "1"), (1, None, None)])
+        self.assertEqual([(check_type, test) for _, _, check_type, test in foo.__typecheck_plan__.checks],
+                         [((int, type(None)), None), ((int, type(None)), None),
+                          ((int, str, type(None)), None)])
+
+    def test_literals(self):
+        # Given
+        @typecheck(Literal["r", "w"], Literal[1, 2], Literal[1, True, "1"])
+        def foo(a, b, c):
+            return (a, b, c)
+
+        # When
+        res = [foo("r", 1, 1), foo("w", 2, True), foo("w", 2, "1")]
+
+        for args in (("x", 1, 1), (["r"], 1, 1), ("r", True, 1), ("r", 1.0, 1), ("r", 1, 1.0),
+                     ("r", 1, False)):
+            with self.assertRaises(TypeError):
+                foo(*args)
+
+        # Then
+        self.assertEqual(res, [("r", 1, 1), ("w", 2, True), ("w", 2, "1")])
+
+    def test_literal_options(self):
+        # Given
+        @typecheck(Optional[Literal["r", "w"]], Union[Literal["a"], Literal["b"], int])
+        def foo(a, b):
+            return (a, b)
+
+        # When
+        res = [foo(None, "a"), foo("r", "b"), foo("w", 1)]
+
+        for args in (("x", "a"), ("r", "c"), ("r", None)):
+            with self.assertRaises(TypeError):
+                foo(*args)
+
+        # Then
+        self.assertEqual(res, [(None, "a"), ("r", "b"), ("w", 1)])
+        self.assertEqual(str(foo.__typecheck_plan__.checks[1][2]), f"({int}, Literal['a', 'b'])")
+
+    def test_annotated_and_any(self):
+        # Given
+        @typecheck(Annotated[int, "size"], Any, Optional[Any])
+        def foo(a, b, c):
+            return (a, b, c)
+
+        # When
+        res = foo(1, "b", "c")
+
+        with self.assertRaises(TypeError):
+            foo("1", "b", "c")
+
+        # Then
+        self.assertEqual(res, (1, "b", "c"))
+        self.assertEqual([(check_type, test) for _, _, check_type, test in foo.__typecheck_plan__.checks],
+                         [(int, None)])
+
+    def test_hints(self):
+        # Given
+        @typecheck.from_hints
+        def foo(a: Optional[int], b: Literal["x", "y"] = "x") -> Annotated[int | None, "a"]:
+            return a
+
+        # When
+        res = [foo(1), foo(None, "y")]
+
+        with self.assertRaises(TypeError):
+            foo(1, "z")
+
+        # Then
+        self.assertEqual(res, [1, None])
+
+    def test_pickle(self):
+        # Given
+        @typecheck(Literal["r", 1])
+        def foo(a):
+            return a
+
+        # When
+        spec = pickle.loads(pickle.dumps(foo.__typecheck_plan__.checks[0][2]))
+
+        # Then
+        self.assertEqual(str(spec), "Literal['r', 1]")
+        self.assertEqual([spec.check(value) for value in ("r", 1, True, "1")], [True, True, False, False])
+
+class TestSampling(unittest.TestCase):
+
+    def tearDown(self):
+        typecheck.set_sampling()
+
+    def test_check_every(self):
+        # Given
+        @typecheck(int, check_every=3)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeError):
+            foo("1") # First call is checked
+
+        res = [foo("2"), foo("3")]
+
+        with self.assertRaises(TypeError):
+            foo("4")
+
+        # Then
+        self.assertEqual(res, ["2", "3"])
+        self.assertEqual(typecheck.sampling_stats(foo), {"checked" : 2, "skipped" : 2})
+
+    def test_check_rate(self):
+        # Given
+        @typecheck(int, check_rate=2)
+        def foo(a):
+            return a
+
+        # When
+        res = [foo(1), foo(2), foo("3"), foo("4")]
+
+        # Then
+        self.assertEqual(res, [1, 2, "3", "4"])
+        self.assertEqual(typecheck.sampling_stats(foo), {"checked" : 2, "skipped" : 2})
+
+    def test_check_every_missing_value(self):
+        # Given
+        @typecheck(int, check_every=0)
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError):
+            foo()
+
+        # Then
+        self.assertEqual(foo("1"), "1")
+
+    def test_fallback_wrapper_sampling(self):
+        # Given
+        @typecheck(int, check_every=2)
+        def foo(_tc_a):
+            return _tc_a
+
+        # When
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        res = foo("2")
+
+        # Then
+        self.assertEqual(res, "2")
+
+    def test_set_global_sampling(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        @typecheck(int, check_every=1)
+        def bar(a):
+            return a
+
+        # When
+        typecheck.set_sampling(every=0)
+        res = foo("1")
+
+        with self.assertRaises(TypeError):
+            bar("1")
+
+        typecheck.set_sampling()
+
+        with self.assertRaises(TypeError):
+            foo("1")
+
+        # Then
+        self.assertEqual(res, "1")
+        self.assertEqual(typecheck.sampling_stats(foo), {"checked" : None, "skipped" : None})
+
+    def test_set_function_sampling(self):
+        # Given
+        @typecheck(int)
+        def foo(a):
+            return a
+
+        @typecheck(int)
+        def bar(a):
+            return a
+
+        # When
+        typecheck.set_sampling(every=0, func=foo)
+        res = foo("1")
+
+        with self.assertRaises(TypeError):
+            bar("1")
+
+        # Then
+        self.assertEqual(res, "1")
+        self.assertEqual(typecheck.sampling_stats(foo), {"checked" : 0, "skipped" : 1})
+
+    def test_bad_sampling(self):
+        # Given
+        def foo(a):
+            return a
+
+        # When
+        with self.assertRaises(TypeCheckError) as e:
+            typecheck(int, check_every=2, check_rate=3)(foo)
+
+        # Then
+        self.assertEqual(str(e.exception), "Exactly one of every and rate must be given")
+
 if __name__ == "__main__":
     unittest.main()
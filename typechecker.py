@@ -1,7 +1,18 @@
 from functools import wraps
-from pydoc import locate
 from functools import partial
-import inspect
+from functools import lru_cache
+from abc import ABCMeta
+from collections.abc import Mapping, Sequence, Set, Reversible, Generator, AsyncGenerator
+from itertools import islice
+from operator import itemgetter
+import builtins
+import os
+import reprlib
+import sys
+import time
+import types
+import weakref
+from _thread import allocate_lock
 
 class TypeCheckerIgnore:
     pass
@@ -11,176 +22,2517 @@ class TypeCheckerUnset:
 
 class TypeCheckError(Exception):
     """Raise when type-checker cannot check the arguments."""
-    pass
 
-def typecheck(*check_args, check_return_type=TypeCheckerUnset, **check_kwargs):
+    def __init__(self, message, function=None, parameter=None):
+        super().__init__(message)
+        self.function = function
+        self.parameter = parameter
+
+    def __reduce__(self):
+        return (TypeCheckError, (str(self), self.function, self.parameter))
+
+class ValueRepr(reprlib.Repr):
+    """ A reprlib.Repr whose output is bounded in both time and size
+        for builtin types, also for large bytes, ints and containers.
+        Other objects are rendered by their own __repr__, then cut.
     """
-        Checks that arguments passed to function
-        is of the type passed to the type checker.
+
+    def __init__(self, limit):
+        super().__init__()
+        self.maxstring = self.maxother = self.maxlong = limit
+
+    def repr_bytes(self, x, level):
+        text = repr(x[:self.maxstring])
+        return text if len(x) <= self.maxstring else text + "..."
+
+    repr_bytearray = repr_bytes
+
+    def repr_int(self, x, level):
+        if x.bit_length() > 4 * self.maxlong: # Avoid converting huge ints to text
+            return f"<int of {x.bit_length()} bits>"
+        return super().repr_int(x, level)
+
+def bounded_str(value, limit):
+    """ Returns the text of value truncated to about limit characters:
+        strings as they are, other values by their ValueRepr, which
+        doesn't render all of a large builtin value first. The __repr__
+        of other classes is rendered in full before it is cut.
     """
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "..."
+    text = ValueRepr(limit).repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
 
-    def error(err_type, err_msg):
-        raise err_type(err_msg)
+class ArgumentTypeError(TypeError):
+    """ Raised when a value fails its type check.
 
-    t_error = partial(error, TypeError)
-    tc_error = partial(error, TypeCheckError)
+        Carries the function name, the parameter (None for return
+        and yielded values), the expected type and the actual type. The message
+        is only formatted when the error is rendered (or args is
+        read), showing the value cut to max_value_length characters.
+        The value itself is only held through a weak reference where
+        possible, so the error does not keep large arguments alive.
+    """
 
-    IGNORE = TypeCheckerIgnore()
-    UNSET = TypeCheckerUnset()
+    max_value_length = 200
 
-    def get_fn_param(fn):
-        """ Returns a list of parameters and a list of
-        default values belonging to fn """
+    def __init__(self, function, parameter, expected, value, yielded=False):
+        super().__init__()
+        self.function = function
+        self.parameter = parameter
+        self.yielded = yielded
+        self.expected = expected
+        self.actual = type(value)
+        try:
+            self.value_ref = weakref.ref(value)
+            self.value_text = None
+        except TypeError:
+            self.value_ref = None
+            self.value_text = bounded_str(value, self.max_value_length)
+        self.message = None
 
-        # Get parameter list
-        params = [param.strip() for param in str(inspect.signature(fn)).replace("(", "").replace(")", "").split(",")]
+    def __reduce__(self):
+        # Pickled with the text of the value, e.g. to reach the parent
+        # process from a worker of a process pool
+        state = {"actual" : self.actual, "value_text" : self.value_str(), "message" : self.message}
+        return (ArgumentTypeError, (self.function, self.parameter, self.expected, None, self.yielded), state)
 
-        # Remove type hints
-        params = [param.split(':')[0] for param in params]
+    def value_str(self):
+        if self.value_text is None:
+            value = self.value_ref()
+            self.value_text = f"<{self.actual.__name__} object>" if value is None else \
+                              bounded_str(value, self.max_value_length)
+        return self.value_text
 
-        # Store possible default values in separate list
-        defaults = [param.split('=')[0] for param in params if len(param.split('=')) > 1 ]
+    def __str__(self):
+        if self.message is None:
+            expected = "callable" if self.expected is callable else f"type {self.expected}"
+            if self.parameter is None:
+                self.message = f"The value '{self.value_str()}' "\
+                               f"{'yielded' if self.yielded else 'returned'} from function '{self.function}' "\
+                               f"is of type {self.actual}, expected {expected}"
+            else:
+                self.message = f"The value '{self.value_str()}' sent to parameter '{self.parameter}' "\
+                               f"of function '{self.function}' is of type {self.actual}, expected {expected}"
+        return self.message
 
-        # Remove default values
-        params = [param.split('=')[0] for param in params]
+    @property
+    def args(self):
+        return (str(self),)
 
-        return params, defaults
+    @args.setter
+    def args(self, args):
+        self.message = str(args[0]) if len(args) == 1 else str(args)
 
-    def get_fn_name(fn):
-        """ Returns a string of the functions name """
-        return str(fn).split()[1].split(".")[-1]
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self)!r})"
 
-    def pass_filter(tup):
-        """ Filters out check tuples that contains pass as an option """
-        return tup if "pass" not in tup else IGNORE
+def error(err_type, err_msg):
+    raise err_type(err_msg)
 
-    def setup_param_dict(fn, args, kwargs):
-        """ Creates and returns a dictionary of the types
-            that is to be checked, formatted as:
-                { parameter_name : expected_type }
-        """
-        params, _ = get_fn_param(fn)
+tc_error = partial(error, TypeCheckError)
+
+IGNORE = TypeCheckerIgnore()
+UNSET = TypeCheckerUnset()
+
+# Flags of code objects, as in inspect
+CO_VARARGS = 0x04
+CO_VARKEYWORDS = 0x08
+CO_GENERATOR = 0x20
+CO_COROUTINE = 0x80
+CO_ASYNC_GENERATOR = 0x200
+
+class Parameter:
+    """ The name, kind and default of a parameter, as in
+        inspect.Parameter, so that plain functions can be decorated
+        without importing inspect, which is slow to import.
+    """
+
+    __slots__ = ("name", "kind", "default")
+
+    POSITIONAL_ONLY, POSITIONAL_OR_KEYWORD, VAR_POSITIONAL, KEYWORD_ONLY, VAR_KEYWORD = range(5)
+    empty = TypeCheckerUnset # No default
+
+    def __init__(self, name, kind, default=TypeCheckerUnset):
+        self.name = name
+        self.kind = kind
+        self.default = default
+
+def get_parameters(fn):
+    """ Returns the Parameters of fn in order. They are read from
+        the code object of plain functions, and other callables
+        (wrapped functions, builtins, ...) go through inspect.
+    """
+    if type(fn) is not types.FunctionType or hasattr(fn, "__wrapped__") or \
+       hasattr(fn, "__signature__"):
+        import inspect
+        return tuple(Parameter(param.name, int(param.kind),
+                               Parameter.empty if param.default is param.empty else param.default)
+                     for param in inspect.signature(fn).parameters.values())
+
+    code = fn.__code__
+    names = code.co_varnames
+    n_positional, n_kwonly = code.co_argcount, code.co_kwonlyargcount
+    defaults = fn.__defaults__ or ()
+    kwdefaults = fn.__kwdefaults__ or {}
+    first_default = n_positional - len(defaults)
+
+    params = []
+    for index in range(n_positional):
+        kind = Parameter.POSITIONAL_ONLY if index < code.co_posonlyargcount \
+               else Parameter.POSITIONAL_OR_KEYWORD
+        default = defaults[index - first_default] if index >= first_default else Parameter.empty
+        params.append(Parameter(names[index], kind, default))
+    variadic = n_positional + n_kwonly
+    if code.co_flags & CO_VARARGS:
+        params.append(Parameter(names[variadic], Parameter.VAR_POSITIONAL))
+        variadic += 1
+    for name in names[n_positional:n_positional + n_kwonly]:
+        params.append(Parameter(name, Parameter.KEYWORD_ONLY, kwdefaults.get(name, Parameter.empty)))
+    if code.co_flags & CO_VARKEYWORDS:
+        params.append(Parameter(names[variadic], Parameter.VAR_KEYWORD))
+    return tuple(params)
+
+def has_code_flag(fn, flag):
+    """ Returns True if fn is a function whose code has flag set,
+        e.g. CO_COROUTINE, as inspect.iscoroutinefunction does.
+    """
+    while isinstance(fn, (partial, types.MethodType)):
+        fn = fn.func if isinstance(fn, partial) else fn.__func__
+    return isinstance(fn, types.FunctionType) and bool(fn.__code__.co_flags & flag)
+
+def get_fn_param(parameters):
+    """ Returns a list of parameters and a list of
+        parameters that have default values, out of the
+        Parameters of a function.
+
+        Parameters are (name, position) pairs where position
+        is None for keyword-only parameters. Variadic
+        parameters (*args, **kwargs) are left out.
+    """
+    params = []
+    defaults = []
+    for index, param in enumerate(parameters):
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        position = None if param.kind == param.KEYWORD_ONLY else index
+        params.append((param.name, position))
+        if param.default is not param.empty:
+            defaults.append(param.name)
+
+    return params, defaults
+
+def get_fn_name(fn):
+    """ Returns a string of the functions name """
+    return str(fn).split()[1].split(".")[-1]
+
+def pass_filter(tup):
+    """ Filters out check tuples that contains pass as an option """
+    return tup if "pass" not in tup else IGNORE
+
+TYPE_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=TYPE_CACHE_SIZE)
+def resolve_type(name, module):
+    """ Returns the type named by name, as seen from module.
+
+        Plain names are looked up in the module and then in
+        builtins, dotted names are looked up attribute by attribute,
+        importing modules as needed. Results are kept in a bounded
+        cache, so each name is only resolved once.
+    """
+    if name == "None":
+        return type(None)
+
+    first, *rest = name.split(".")
+    namespace = vars(sys.modules[module]) if module in sys.modules else {}
+    if first in namespace:
+        obj = namespace[first]
+    elif hasattr(builtins, first):
+        obj = getattr(builtins, first)
+    else:
+        # Import the longest importable prefix of the dotted name
+        obj = None
+        for end in range(len(rest), -1, -1):
+            try:
+                import importlib
+                obj = importlib.import_module(".".join([first, *rest[:end]]))
+            except ImportError:
+                continue
+            rest = rest[end:]
+            break
+        if obj is None:
+            tc_error(f"Could not resolve the type '{name}'")
+
+    for attr in rest:
+        try:
+            obj = getattr(obj, attr)
+        except AttributeError:
+            tc_error(f"Could not resolve the type '{name}'")
+
+    if not isinstance(obj, type):
+        tc_error(f"The name '{name}' does not refer to a type")
+    return obj
+
+class Check:
+    """ Base of the check types that are not a plain isinstance call.
+
+        Subclasses define check(value), True if value passes; str() gives
+        the expected type shown in error messages. Checks are pickled
+        as the arguments they were made from, and rebuild their
+        compiled parts and caches when unpickled (e.g. in a worker).
+    """
+
+    def __repr__(self):
+        return str(self)
+
+class LazyType(Check):
+    """ A check type given by name, such as "int" or "Foo",
+        that is resolved the first time it is used.
+    """
+
+    def __init__(self, name, module):
+        self.name = name
+        self.module = module
+        self.type = None
+
+    def resolve(self):
+        """ Returns the type to pass to isinstance """
+        if self.type is None:
+            self.type = resolve_type(self.name, self.module)
+        return self.type
+
+    def check(self, value):
+        return isinstance(value, self.resolve())
+
+    def __str__(self):
+        return str(self.resolve())
+
+    def __reduce__(self):
+        return (LazyType, (self.name, self.module))
+
+class OptionsCheck(Check):
+    """ A tuple of options where some options are not plain types.
+        The plain types are checked with a single isinstance call.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.types = tuple(option for option in options if compile_check(option) is None)
+        self.tests = tuple(test for test in map(compile_check, options) if test is not None)
+
+    def check(self, value):
+        if isinstance(value, self.types):
+            return True
+        for test in self.tests:
+            if test(value):
+                return True
+        return False
+
+    def __str__(self):
+        return str(self.options)
+
+    def __reduce__(self):
+        return (OptionsCheck, (self.options,))
+
+class SubclassCheck(Check):
+    """ A type[X] spec, passed by X and its subclasses """
+
+    def __init__(self, spec, check_type):
+        self.spec = spec
+        self.check_type = check_type
+
+    def check(self, value):
+        return isinstance(value, type) and issubclass(value, self.check_type)
+
+    def __str__(self):
+        return str(self.spec)
+
+    def __reduce__(self):
+        return (SubclassCheck, (self.spec, self.check_type))
+
+class LiteralCheck(Check):
+    """ The values of a typing.Literal, checked with a frozenset
+        membership test. As in typing, values also need the type of
+        the literal, so that Literal[1] is not passed by True or 1.0.
+    """
+
+    def __init__(self, values):
+        self.values = tuple(values)
+        self.members = frozenset(self.values)
+        self.types = frozenset(map(type, self.values))
+        # With a single type, values equal to a literal are that literal
+        self.keys = None if len(self.types) == 1 else \
+                    frozenset((type(value), value) for value in self.values)
+
+    def check(self, value):
+        if type(value) not in self.types:
+            return False
+        if self.keys is None:
+            return value in self.members
+        return (type(value), value) in self.keys
+
+    def __str__(self):
+        return f"Literal[{', '.join(map(repr, self.values))}]"
+
+    def __reduce__(self):
+        return (LiteralCheck, (self.values,))
+
+ELEMENT_STRATEGIES = ("full", "edges", "random")
+ELEMENT_SAMPLE_SIZE = 8
+
+def parse_strategy(check_elements):
+    """ Returns (strategy, k) for the check_elements setting, which is
+        'full', 'edges' or 'random', or a (strategy, k) tuple.
+    """
+    try:
+        strategy, k = (check_elements, ELEMENT_SAMPLE_SIZE) if isinstance(check_elements, str) \
+                      else check_elements
+    except (TypeError, ValueError):
+        tc_error(f"check_elements must be a strategy or a (strategy, k) tuple, got '{check_elements}'")
+    if strategy not in ELEMENT_STRATEGIES:
+        tc_error(f"Unknown element check strategy '{strategy}', "\
+                 f"expected one of {', '.join(ELEMENT_STRATEGIES)}")
+    if not isinstance(k, int) or k < 1:
+        tc_error(f"The number of elements to check must be a positive int, got '{k}'")
+    return strategy, k
+
+def element_test(check_type):
+    """ Returns a function checking a single element """
+    if check_type is IGNORE:
+        return lambda value: True
+    test = compile_check(check_type)
+    if test is None:
+        return lambda value: isinstance(value, check_type)
+    return test
+
+def all_pass(check_type, test, values):
+    """ Returns True if all values pass the check """
+    if test is None:
+        # Check each distinct type once, collecting them runs in C
+        return all(issubclass(value_type, check_type) for value_type in set(map(type, values)))
+    return all(map(test, values))
+
+class ContainerCheck(Check):
+    """ A container spec such as list[int], dict[str, float],
+        tuple[int, ...] or tuple[int, str].
+
+        The elements are checked according to strategy:
+            'full'   - all elements
+            'edges'  - the first and last k elements
+            'random' - k elements picked at random
+        Fixed length tuples are always checked in full, and for
+        containers that can't be indexed (sets, dicts) 'random'
+        checks the edges instead.
+    """
+
+    def __init__(self, spec, origin, args, strategy, k, module):
+        self.spec = spec
+        self.origin = origin
+        self.args = args
+        self.strategy = strategy
+        self.k = k
+        self.module = module
+        parse = partial(parse_arg, module=module, check_elements=(strategy, k))
+
+        self.fixed = None
+        self.keys = self.values = IGNORE
+        if issubclass(origin, Mapping):
+            if len(args) == 2:
+                self.keys, self.values = parse(args[0]), parse(args[1])
+        elif origin is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+            self.fixed = tuple(parse(arg) for arg in args)
+            self.fixed_tests = tuple(element_test(arg) for arg in self.fixed)
+        elif args:
+            self.values = parse(args[0])
+
+        if strategy == "random":
+            import random
+            self.random_sample = random.sample
+        self.key_test = None if self.keys is IGNORE else compile_check(self.keys)
+        self.value_test = None if self.values is IGNORE else compile_check(self.values)
+
+    def sample(self, values):
+        """ Returns the elements of values to check """
+        n = len(values)
+        k = self.k
+        if self.strategy == "full" or n <= 2 * k:
+            return values
+        if isinstance(values, Sequence):
+            if self.strategy == "random":
+                return [values[i] for i in self.random_sample(range(n), k)]
+            # By index, as a Sequence (e.g. a deque) need not take slices
+            return [values[i] for i in (*range(k), *range(n - k, n))]
+        first = list(islice(values, k))
+        if isinstance(values, Reversible):
+            return first + list(islice(reversed(values), k))
+        return first
+
+    def check(self, value):
+        if not isinstance(value, self.origin):
+            return False
+
+        if self.fixed is not None:
+            return len(value) == len(self.fixed) and \
+                   all(test(item) for test, item in zip(self.fixed_tests, value))
+
+        if self.keys is not IGNORE:
+            keys = self.sample(value.keys())
+            if not all_pass(self.keys, self.key_test, keys):
+                return False
+            if self.values is not IGNORE:
+                return all_pass(self.values, self.value_test, [value[key] for key in keys])
+            return True
+
+        if self.values is not IGNORE:
+            return all_pass(self.values, self.value_test, self.sample(value))
+        return True
+
+    def __str__(self):
+        return str(self.spec)
+
+    def __reduce__(self):
+        return (ContainerCheck, (self.spec, self.origin, self.args, self.strategy, self.k, self.module))
+
+def import_numpy():
+    """ Returns the numpy module, which is only needed for array specs """
+    try:
+        import numpy
+    except ImportError:
+        tc_error("Array specs need numpy, which is not installed")
+    return numpy
+
+class ArraySpec(Check):
+    """ A NumPy array spec, checked from the array metadata in O(1).
+
+        dtype       - dtype or dtype class the array must be, abstract
+                      classes such as numpy.floating match all subtypes
+        ndim        - number of dimensions
+        shape       - tuple of sizes, None matches any size
+        contiguous  - 'C' or 'F' (True meaning 'C')
+        finite      - if True, no element may be nan or inf, checked
+                      with a single vectorized reduction
+    """
+
+    def __init__(self, dtype=None, ndim=None, shape=None, contiguous=None, finite=False):
+        self.np = import_numpy()
+        if shape is not None:
+            shape = tuple(shape)
+            if ndim is not None and ndim != len(shape):
+                tc_error(f"The shape {shape} does not have {ndim} dimensions")
+            ndim = len(shape)
+        if contiguous is True:
+            contiguous = "C"
+        if contiguous not in (None, "C", "F"):
+            tc_error(f"Contiguous must be 'C' or 'F', got '{contiguous}'")
+
+        self.dtype = dtype
+        self.ndim = ndim
+        self.shape = shape
+        self.contiguous = contiguous
+        self.finite = finite
+        self.dtype_verdicts = {}
+
+    def __reduce__(self):
+        return (ArraySpec, (self.dtype, self.ndim, self.shape, self.contiguous, self.finite))
+
+    def dtype_matches(self, dtype):
+        """ Returns True if dtype matches, computed once per dtype """
+        verdict = self.dtype_verdicts.get(dtype)
+        if verdict is None:
+            verdict = self.dtype_verdicts[dtype] = bool(self.np.issubdtype(dtype, self.dtype))
+        return verdict
+
+    def check(self, value):
+        if not isinstance(value, self.np.ndarray):
+            return False
+        if self.ndim is not None and value.ndim != self.ndim:
+            return False
+        if self.shape is not None:
+            for size, expected in zip(value.shape, self.shape):
+                if expected is not None and size != expected:
+                    return False
+        if self.dtype is not None and not self.dtype_matches(value.dtype):
+            return False
+        if self.contiguous == "C" and not value.flags.c_contiguous:
+            return False
+        if self.contiguous == "F" and not value.flags.f_contiguous:
+            return False
+        if self.finite and value.dtype.kind in "fc" and not self.np.isfinite(value).all():
+            return False
+        return True
+
+    def __str__(self):
+        details = []
+        if self.dtype is not None:
+            dtype = getattr(self.dtype, "__name__", None) or self.np.dtype(self.dtype)
+            details.append(f"dtype={dtype}")
+        if self.shape is not None:
+            details.append(f"shape=({', '.join('*' if size is None else str(size) for size in self.shape)})")
+        elif self.ndim is not None:
+            details.append(f"ndim={self.ndim}")
+        if self.contiguous is not None:
+            details.append(f"{self.contiguous}-contiguous")
+        if self.finite:
+            details.append("finite")
+        return f"ndarray[{', '.join(details)}]"
+
+class LazyHint(Check):
+    """ A type hint that could not be evaluated when the function was
+        decorated, such as a forward reference to a class defined
+        later, that is evaluated the first time it is used.
+    """
+
+    def __init__(self, hint, fn, check_elements, localns=None):
+        self.hint = hint
+        self.fn = fn
+        self.localns = localns
+        self.check_elements = check_elements
+        self.check_type = None
+        self.test = None
+
+    def resolve(self):
+        """ Returns the test of the evaluated hint """
+        if self.test is None:
+            try:
+                value = eval(self.hint, globals_of(self.fn), self.localns)
+            except NameError:
+                tc_error(f"Could not resolve the type hint '{self.hint}'")
+            check_type = parse_arg(value, self.fn.__module__, self.check_elements)
+            test = compile_check(check_type)
+            self.check_type = check_type
+            self.test = test if test is not None else partial(isinstance_of, check_type)
+        return self.test
+
+    def check(self, value):
+        return self.resolve()(value)
 
-        # Make a params dict with all values being UNSET
-        params = { kw_param : UNSET for kw_param in params }
+    def __str__(self):
+        self.resolve()
+        return str(self.check_type)
+
+    def __reduce__(self):
+        # Pickled as the check it evaluates to, parse_arg leaving it as is
+        self.resolve()
+        return (parse_arg, (self.check_type,))
+
+def globals_of(fn):
+    """ Returns the globals that the hints of a function or class refer to """
+    if hasattr(fn, "__globals__"):
+        return fn.__globals__
+    module = sys.modules.get(getattr(fn, "__module__", None))
+    return vars(module) if module is not None else {}
+
+def isinstance_of(check_type, value):
+    return isinstance(value, check_type)
+
+def parse_arg(arg, module=None, check_elements="full"):
+    """ Convert input to the type passed to isinstance
+
+        If string 'pass' set to IGNORE;
+        If the builtin callable leave it, set to callable check;
+        If None set to NoneType;
+        If string set to a LazyType resolved on first use;
+        If Union, Optional or X | Y parse as the tuple of its options;
+        If Literal set to a LiteralCheck;
+        If Annotated parse the annotated type, if Any set to IGNORE;
+        If TypeVar parse its bound or constraints, IGNORE if it has none;
+        If TypedDict set to dict;
+        If NewType parse its supertype, if Self or NoReturn set to IGNORE;
+        If LiteralString set to str, if TypeGuard set to bool;
+        If tuple parse each option, IGNORE if any is 'pass' or Any;
+        If container spec (e.g. list[int]) set to a ContainerCheck;
+        If type[X] set to a SubclassCheck;
+        If other generic alias (e.g. Callable[[int], str]) set to its origin;
+        If typing.Protocol class set to its AttributeSpec;
+        If classes and types leave them, else raise TypeCheckError;
+    """
+    if isinstance(arg, str):
+        return IGNORE if arg == "pass" else LazyType(arg, module)
+    if arg is None:
+        return type(None)
+    if hasattr(arg, "__forward_arg__"): # typing.ForwardRef
+        return LazyType(arg.__forward_arg__, module)
+    if isinstance(arg, types.UnionType): # int | None
+        return parse_union(arg.__args__, module, check_elements)
+    # typing constructs only exist once typing was imported
+    typing = sys.modules.get("typing")
+    if typing is not None:
+        if arg is typing.Any:
+            return IGNORE
+        if hasattr(arg, "__metadata__"): # Annotated[T, ...] is checked as T
+            return parse_arg(arg.__origin__, module, check_elements)
+        origin = getattr(arg, "__origin__", None)
+        if origin is typing.Union:
+            return parse_union(arg.__args__, module, check_elements)
+        if origin is typing.Literal:
+            return LiteralCheck(arg.__args__)
+        if isinstance(arg, typing.TypeVar):
+            return parse_typevar(arg, module, check_elements)
+        if typing.is_typeddict(arg): # Has no instances, its values are dicts
+            return dict
+        if isinstance(arg, typing.NewType): # UserId = NewType("UserId", int)
+            return parse_arg(arg.__supertype__, module, check_elements)
+        if arg is typing.NoReturn or arg is getattr(typing, "Never", None) or \
+                arg is getattr(typing, "Self", None):
+            return IGNORE # Never returns, or any instance of the class
+        if arg is getattr(typing, "LiteralString", None):
+            return str
+        if origin is getattr(typing, "TypeGuard", None):
+            return bool
+    if is_protocol(arg):
+        return AttributeSpec.from_protocol(arg)
+    if isinstance(arg, tuple):
+        if pass_filter(arg) is IGNORE:
+            return IGNORE
+        options = tuple(parse_arg(option, module, check_elements) for option in arg)
+        if IGNORE in options: # e.g. Optional[Any]
+            return IGNORE
+        if all(compile_check(option) is None for option in options):
+            return options
+        return OptionsCheck(options)
+    origin = getattr(arg, "__origin__", None)
+    if isinstance(origin, type) and hasattr(arg, "__args__"):
+        if origin is type:
+            return parse_subclass(arg, module, check_elements)
+        if not is_container(origin):
+            # Callable[...], Iterator[...], ... only check the origin, their
+            # elements can't be checked without calling or consuming them.
+            # Parsed again, as the origin may be a Protocol, e.g. Box[int]
+            return parse_arg(origin, module, check_elements)
+        strategy, k = parse_strategy(check_elements)
+        return ContainerCheck(arg, origin, arg.__args__, strategy, k, module)
+    if isinstance(origin, type): # Unsubscripted typing.List, typing.Callable, ...
+        return origin
+    if not isinstance(arg, (type, Check)) and arg is not callable:
+        tc_error(f"Can't check values against '{arg}', it is not a type")
+    return arg
+
+def parse_typevar(var, module, check_elements):
+    """ Returns the check of a TypeVar: its bound, or the tuple of
+        its constraints, and IGNORE if it can be any type.
+    """
+    if var.__bound__ is not None:
+        return parse_arg(var.__bound__, module, check_elements)
+    if var.__constraints__:
+        return parse_arg(var.__constraints__, module, check_elements)
+    return IGNORE
+
+def is_container(origin):
+    """ Returns True if the elements of origin can be checked without
+        changing it: sized containers that can be iterated again.
+    """
+    return origin is tuple or issubclass(origin, (Sequence, Mapping, Set))
+
+def parse_subclass(spec, module, check_elements):
+    """ Returns the check of type[X], classes that are subclasses of X """
+    check_type = parse_arg(spec.__args__[0], module, check_elements)
+    if check_type is IGNORE or compile_check(check_type) is not None:
+        return type # type[Any], or classes that can't be told by issubclass
+    return SubclassCheck(spec, check_type)
+
+def parse_union(options, module, check_elements):
+    """ Parses the options of a union as a tuple, merging the options
+        that are literals into a single LiteralCheck.
+    """
+    typing = sys.modules.get("typing")
+    is_literal = lambda option: typing is not None and \
+                                getattr(option, "__origin__", None) is typing.Literal
+    values = [value for option in options if is_literal(option) for value in option.__args__]
+    options = tuple(option for option in options if not is_literal(option))
+    if values:
+        options += (LiteralCheck(values),)
+    return parse_arg(options, module, check_elements)
+
+def compile_check(check_type):
+    """ Returns the test function for a parsed check type,
+        or None if the check is a plain isinstance call.
+    """
+    if check_type is callable:
+        return callable
+    if isinstance(check_type, Check):
+        return check_type.check
+    return None
+
+MAX_VERDICTS = 64
+
+def type_decides(cls):
+    """ Returns True if isinstance(value, cls) only depends on
+        type(value), which holds for plain classes and ABCs, and
+        for Protocols that only have methods.
+    """
+    if type(cls).__instancecheck__ is type.__instancecheck__:
+        return True
+    if not isinstance(cls, ABCMeta):
+        return False # A metaclass with its own __instancecheck__
+    if not is_protocol(cls):
+        return True
+    return all(callable(getattr(cls, attr, None)) for attr in protocol_attrs(cls))
+
+def is_protocol(cls):
+    """ Returns True if cls is a typing.Protocol class """
+    return isinstance(cls, type) and getattr(cls, "_is_protocol", False) is True
+
+def protocol_attrs(cls):
+    """ Returns the names of the members of the Protocol class cls """
+    attrs = getattr(cls, "__protocol_attrs__", None)
+    if attrs is None:
+        import typing
+        attrs = typing._get_protocol_attrs(cls)
+    return sorted(attrs)
+
+def cacheable(check_type):
+    """ Returns True if the isinstance check of check_type runs
+        __instancecheck__ in Python (ABCs and Protocols), and its
+        verdict can be cached by type.
+    """
+    options = check_type if isinstance(check_type, tuple) else (check_type,)
+    return all(isinstance(option, type) and type_decides(option) for option in options) and \
+           any(isinstance(option, ABCMeta) for option in options)
+
+class VerdictCache(Check):
+    """ An isinstance check against ABCs or Protocols that remembers
+        the types of value that passed, so that repeat calls cost a
+        dict lookup instead of the __instancecheck__ machinery.
+
+        The types are kept by id, each with a weak reference removing
+        it when the type goes away, and at most MAX_VERDICTS are kept.
+        Only passes are cached: registering a class with an ABC can
+        make a type pass later, never fail.
+    """
+
+    def __init__(self, check_type):
+        self.check_type = check_type
+        # id(type) -> weakref.ref(type), one dict so that each update
+        # is a single operation, safe with threads
+        self.verdicts = {}
+
+    def check(self, value):
+        return self.verdicts.get(id(type(value))) is not None or self.full_check(value)
+
+    def full_check(self, value):
+        """ Runs the isinstance check, caching the type if it passes """
+        if not isinstance(value, self.check_type):
+            return False
+        self.remember(type(value))
+        return True
+
+    def remember(self, cls):
+        """ Caches that values of type cls pass """
+        key = id(cls)
+        verdicts = self.verdicts
+        if len(verdicts) >= MAX_VERDICTS:
+            verdicts.clear()
+
+        def forget(ref):
+            if verdicts.get(key) is ref:
+                verdicts.pop(key, None)
+
+        verdicts[key] = weakref.ref(cls, forget)
+
+    def __str__(self):
+        return str(self.check_type)
+
+    def __reduce__(self):
+        return (VerdictCache, (self.check_type,))
+
+class AttributeSpec(VerdictCache):
+    """ A structural spec, passed by values that have all the given
+        attributes whatever their class, e.g. AttributeSpec("read",
+        "close") for file-like values. typing.Protocol classes are
+        checked as the spec of their members, runtime_checkable or not.
+
+        The verdict is computed once per class and cached when all
+        the attributes are found on the class, so that repeat calls
+        cost a dict lookup. Attributes only found on the value (set
+        in __init__, say) are looked up on every value. Methods set
+        to None on the class (such as __hash__ = None) are missing.
+        As with ABCs, only passes are cached: a class that gets the
+        attributes later passes, but deleting an attribute from a
+        class that already passed isn't noticed.
+    """
+
+    def __init__(self, *names, protocol=None):
+        if not names and protocol is None:
+            tc_error("An attribute spec needs at least one attribute name")
+        if not all(isinstance(name, str) for name in names):
+            tc_error(f"The attribute names must be strings, got {names}")
+        super().__init__(protocol)
+        self.names = names
+
+    @classmethod
+    def from_protocol(cls, protocol):
+        """ Returns the spec of the members of a Protocol class """
+        return cls(*protocol_attrs(protocol), protocol=protocol)
+
+    def full_check(self, value):
+        """ Looks the attributes up, caching the class if they are all on it """
+        cls = type(value)
+        on_class = True
+        for name in self.names:
+            attr = getattr(cls, name, UNSET)
+            if attr is UNSET:
+                on_class = False
+                if not hasattr(value, name):
+                    return False
+            elif attr is None:
+                return False
+        if on_class:
+            self.remember(cls)
+        return True
+
+    def __str__(self):
+        if self.check_type is not None:
+            return str(self.check_type)
+        return f"AttributeSpec({', '.join(map(repr, self.names))})"
+
+    def __reduce__(self):
+        if self.check_type is not None:
+            return (AttributeSpec.from_protocol, (self.check_type,))
+        return (AttributeSpec, self.names)
+
+def verdict_test(check_type):
+    """ Returns compile_check(check_type), but with a VerdictCache
+        for the isinstance checks that can be cached.
+    """
+    test = compile_check(check_type)
+    if test is None and cacheable(check_type):
+        return VerdictCache(check_type).check
+    return test
+
+SPEC_CACHE_SIZE = 1024
+
+def parse_check(arg, module=None, check_elements="full"):
+    """ Returns the parsed check type of a spec and its test, as
+        parse_arg and verdict_test do. Equal specs in a module get the
+        same ones, verdict cache and all, so that functions checking
+        the same types share them. Specs that can't be hashed (and
+        checks, which are already built) are parsed every time.
+    """
+    if not isinstance(arg, Check):
+        try:
+            return interned_check(arg, module, check_elements)
+        except TypeError: # Unhashable spec
+            pass
+    check_type = parse_arg(arg, module, check_elements)
+    return check_type, verdict_test(check_type)
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def interned_check(arg, module, check_elements):
+    check_type = parse_arg(arg, module, check_elements)
+    return check_type, verdict_test(check_type)
+
+def is_bare_decorator(check_args, check_kwargs):
+    """ Returns True if typecheck was used without any checks,
+        i.e. as @typecheck, and so was given the function itself.
+    """
+    if len(check_args) != 1 or check_kwargs or check_args[0] is callable:
+        return False
+    arg = check_args[0]
+    if isinstance(arg, (types.FunctionType, types.MethodType)):
+        return True
+    if isinstance(arg, (type, str, tuple, Check)) or arg is None:
+        return False
+    import inspect
+    return inspect.isroutine(arg)
+
+class Sampler:
+    """ Decides which calls of a function are checked, either one
+        in every calls (0 meaning none) or at most rate calls per
+        second. The other calls are passed straight through.
+
+        sample is the bound method deciding each call, which the
+        generated wrappers call, and checked and skipped count the
+        calls seen by the sampler.
+    """
+
+    def __init__(self, every=None, rate=None):
+        if (every is None) == (rate is None):
+            tc_error("Exactly one of every and rate must be given")
+        if (every if rate is None else rate) < 0:
+            tc_error("The sampling every and rate can't be negative")
+        self.every = every
+        self.rate = rate
+        self.calls = 0
+        self.window_end = 0.0
+        self.window_checked = 0
+        self.rate_checked = 0
+        if rate is not None:
+            self.sample = self.sample_rate
+        elif every == 0:
+            self.sample = self.sample_none
+        else:
+            self.sample = self.sample_every
+
+    def __call__(self):
+        """ Returns True if the current call is to be checked """
+        return self.sample()
+
+    # Each call only counts the calls, checked and skipped are derived
+
+    def sample_every(self):
+        calls = self.calls
+        self.calls = calls + 1
+        return calls % self.every == 0
+
+    def sample_none(self):
+        self.calls += 1
+        return False
+
+    def sample_rate(self):
+        self.calls += 1
+        now = time.monotonic()
+        if now >= self.window_end:
+            self.window_end = now + 1.0
+            self.window_checked = 0
+        if self.window_checked >= self.rate:
+            return False
+        self.window_checked += 1
+        self.rate_checked += 1
+        return True
+
+    @property
+    def checked(self):
+        if self.rate is not None:
+            return self.rate_checked
+        return -(-self.calls // self.every) if self.every else 0
+
+    @property
+    def skipped(self):
+        return self.calls - self.checked
+
+class FunctionStats:
+    """ Counters of a decorated function: calls, calls that were
+        checked, failed checks by parameter ('return' and 'yield' for
+        results), and the ns spent checking and in the function.
+    """
+
+    __slots__ = ("checks_per_call", "calls", "checked", "failures", "check_ns", "call_ns")
+
+    def __init__(self, checks_per_call):
+        self.checks_per_call = checks_per_call
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.checked = 0
+        self.failures = {}
+        self.check_ns = 0
+        self.call_ns = 0
+
+    def failed(self, param):
+        self.failures[param] = self.failures.get(param, 0) + 1
+
+    def as_dict(self):
+        return {
+            "calls" : self.calls,
+            "checked" : self.checked,
+            "checks" : self.checked * self.checks_per_call,
+            "failures" : dict(self.failures),
+            "check_ns" : self.check_ns,
+            "call_ns" : self.call_ns,
+        }
+
+# Concurrency model: a plan is built once, at decoration time, and calls
+# only read it, without locks. The lazily resolved parts (LazyType,
+# LazyHint) may be resolved by several threads at once, which is harmless
+# as they all get the same result and publish it with a single store. The
+# caches (VerdictCache, the ArraySpec dtypes, the reports of failures) are
+# dicts updated with single operations. Only the opt-in sampling and stats
+# counters are shared per call; they are plain increments, which may
+# lose counts under contention. PLANS_LOCK guards the registries of plans
+# and shared layouts, used when decorating and by the runtime settings,
+# never by calls. Layouts, checks and generated code shared between
+# functions are never changed once built.
+PLANS = weakref.WeakSet()
+PLANS_LOCK = allocate_lock()
+GLOBAL_SAMPLING = {"every" : None, "rate" : None}
+GLOBAL_STATS = {"enabled" : False}
+GLOBAL_MODE = {"mode" : "raise", "interval" : 60.0}
+MAX_REPORT_KEYS = 1024
+
+def read_disabled():
+    """ Returns the module patterns of the TYPECHECK_DISABLE environment
+        variable, separated by commas or spaces. Under python -O, when
+        the variable is not set, all modules are disabled, as asserts.
+    """
+    text = os.environ.get("TYPECHECK_DISABLE")
+    if text is None:
+        return () if __debug__ else ("*",)
+    return tuple(text.replace(",", " ").split())
+
+# Read once at import, module name -> whether it is disabled
+GLOBAL_DISABLE = {"patterns" : read_disabled(), "modules" : {}}
+STRIPPED = set() # Qualified names, closures made in a loop are one entry
+
+def module_disabled(module, patterns):
+    """ Returns True if module, or a package it is in, matches one of
+        the glob patterns, e.g. 'app' or 'app.*' for app.views.
+    """
+    if "*" in patterns:
+        return True
+    from fnmatch import fnmatchcase
+    parts = module.split(".")
+    names = [".".join(parts[:end]) for end in range(1, len(parts) + 1)]
+    return any(fnmatchcase(name, pattern) for name in names for pattern in patterns)
+
+def is_disabled(fn):
+    """ Returns True if fn is in a module whose checks are disabled """
+    patterns = GLOBAL_DISABLE["patterns"]
+    if not patterns:
+        return False
+    module = getattr(fn, "__module__", None) or ""
+    disabled = GLOBAL_DISABLE["modules"].get(module)
+    if disabled is None:
+        disabled = GLOBAL_DISABLE["modules"][module] = module_disabled(module, patterns)
+    return disabled
+
+def strip(fn):
+    """ Returns fn unchanged, recording that it is not checked """
+    STRIPPED.add(f"{getattr(fn, '__module__', None)}.{getattr(fn, '__qualname__', get_fn_name(fn))}")
+    return fn
+
+def parse_mode(mode):
+    """ Reports bad check modes, which are 'raise', 'log' or a hook """
+    if mode not in ("raise", "log") and not callable(mode):
+        tc_error(f"The check mode must be 'raise', 'log' or a callable, got '{mode}'")
+    return mode
+
+class CheckLayout:
+    """ The checks of a plan that only depend on the parameters and
+        the specs, shared by all the functions with equal ones, so
+        that thousands of functions with one signature keep one set
+        of checks (and verdict caches) between them.
+
+        checks is a tuple of (position, parameter, type, test) for
+        every parameter that is to be checked, where test is None when
+        the check is a plain isinstance call, and required is a
+        tuple of (position, parameter) for the parameters without
+        default values.
+    """
+
+    __slots__ = ("checks", "required", "n_required_positional", "has_required_kwonly",
+                 "check_return_type", "return_test", "__weakref__")
+
+    def __init__(self, checks, required, check_return_type, return_test):
+        self.checks = checks
+        self.required = required
+        self.n_required_positional = sum(1 for position, _ in required if position is not None)
+        self.has_required_kwonly = any(position is None for position, _ in required)
+        self.check_return_type = check_return_type
+        self.return_test = return_test
+
+# (parameters, checks, return type) -> CheckLayout, while used by a plan
+LAYOUTS = weakref.WeakValueDictionary()
+
+def get_layout(checks, required, check_return_type, return_test):
+    """ Returns the shared CheckLayout of the given checks """
+    key = (checks, required, check_return_type)
+    try:
+        hash(key)
+    except TypeError: # Unhashable specs are not shared
+        return CheckLayout(checks, required, check_return_type, return_test)
+    with PLANS_LOCK:
+        layout = LAYOUTS.get(key)
+        if layout is None:
+            layout = LAYOUTS[key] = CheckLayout(checks, required, check_return_type, return_test)
+        return layout
+
+class CheckPlan:
+    """ The compiled checks of a decorated function.
+
+        Built once when the function is decorated, so that
+        the wrapper only has to bind values and run isinstance.
+
+        The checks themselves are in the shared layout, and the plan
+        only keeps what belongs to the function: the function, its
+        defaults, wrapper and settings.
+    """
+
+    __slots__ = ("func", "wrapper", "layout", "namespace",
+                 "check_yield_type", "yield_wrapper", "yield_test", "yield_isinstance",
+                 "check_yield_every", "stats_setting", "stats", "mode_setting", "interval_setting", "reports",
+                 "sampler", "sampling", "__weakref__")
+
+    def __init__(self, fn, check_args, check_kwargs, check_return_type,
+                 check_every=None, check_rate=None, check_elements="full",
+                 check_yield_type=TypeCheckerUnset, check_yield_every=1, check_stats=None,
+                 check_mode=None):
+        self.func = fn
+        self.wrapper = None
+        module = getattr(fn, "__module__", None)
+        params, defaults = get_fn_param(get_parameters(fn))
+        positions = dict(params)
+        parse_strategy(check_elements) # Report bad settings without container specs too
 
         # Go through and add all args
-        for param, arg in zip(params, args):
-            params[param] = parse_arg(arg)
+        check_types = {}
+        for (param, _), arg in zip(params, check_args):
+            check_types[param] = parse_check(arg, module, check_elements)
 
         # Go through and add all kwargs (if collision throw error)
-        for param, check_type in kwargs.items():
-            try:
-                if params[param] is not UNSET:
-                    raise tc_error(f"The kwarg '{param}' is already set by arg")
-                params[param] = parse_arg(check_type)
-            except KeyError:
-                raise tc_error(f"The given kwarg '{param}' is not a parameter of function '{fn}'")
-
-        # Replace all UNSET with IGNORE
-        for param in params:
-            if params[param] == UNSET:
-                params[param] = IGNORE
-        return params
-
-    def unify_values(fn, args, kwargs):
-        """ Creates and returns a unified dictionary of given
-            arguments and keyword arguments, formatted as:
-                { parameter_name : given_value }
+        for param, check_type in check_kwargs.items():
+            if param not in positions:
+                raise TypeCheckError(f"The given kwarg '{param}' is not a parameter of function '{fn}'",
+                                     self.fn_name, param)
+            if param in check_types:
+                raise TypeCheckError(f"The kwarg '{param}' is already set by arg", self.fn_name, param)
+            check_types[param] = parse_check(check_type, module, check_elements)
+
+        checks = []
+        for param, position in params:
+            check_type, test = check_types.get(param, (IGNORE, None))
+            if check_type is IGNORE:
+                continue
+            checks.append((position, param, check_type, test))
+
+        required = tuple((position, param) for param, position in params
+                         if param not in defaults)
+        if check_return_type is TypeCheckerUnset:
+            return_test = None
+        else:
+            check_return_type, return_test = parse_check(check_return_type, module, check_elements)
+            if check_return_type is IGNORE: # e.g. an unbound TypeVar
+                check_return_type, return_test = TypeCheckerUnset, None
+        self.layout = get_layout(tuple(checks), required, check_return_type, return_test)
+
+        self.check_yield_type = TypeCheckerUnset
+        self.yield_wrapper = self.yield_test = self.yield_isinstance = None
+        self.check_yield_every = check_yield_every
+        if check_yield_type is not TypeCheckerUnset:
+            if not isinstance(check_yield_every, int) or check_yield_every < 1:
+                tc_error(f"check_yield_every must be a positive int, got '{check_yield_every}'")
+            if has_code_flag(fn, CO_GENERATOR):
+                self.yield_wrapper = CheckedGenerator
+            elif has_code_flag(fn, CO_ASYNC_GENERATOR):
+                self.yield_wrapper = CheckedAsyncGenerator
+            else:
+                tc_error(f"check_yield_type needs a generator function, got '{fn}'")
+            check_yield_type, yield_test = parse_check(check_yield_type, module, check_elements)
+        if check_yield_type is not TypeCheckerUnset and check_yield_type is not IGNORE:
+            self.check_yield_type = check_yield_type
+            self.yield_test = yield_test or element_test(check_yield_type)
+            # Every item of a plain type is checked inline by CheckedGenerator
+            self.yield_isinstance = check_yield_every == 1 and yield_test is None
+        else:
+            self.yield_wrapper = None
+
+        self.namespace = {}
+        self.stats_setting = check_stats
+        self.stats = FunctionStats(len(self.checks) + (self.check_return_type is not TypeCheckerUnset)) \
+                     if (GLOBAL_STATS["enabled"] if check_stats is None else check_stats) else None
+        self.mode_setting = None if check_mode is None else parse_mode(check_mode)
+        self.interval_setting = None
+        self.reports = None # Made on the first report
+        self.sampler = None
+        self.sampling = None
+        if check_every is not None or check_rate is not None:
+            self.sampling = {"every" : check_every, "rate" : check_rate}
+            Sampler(check_every, check_rate) # Report bad settings when decorating
+        with PLANS_LOCK:
+            PLANS.add(self)
+
+    @property
+    def parameters(self):
+        # Read again when needed, wrappers are built once
+        return get_parameters(self.func)
+
+    @property
+    def checks(self):
+        return self.layout.checks
+
+    @property
+    def required(self):
+        return self.layout.required
+
+    @property
+    def check_return_type(self):
+        return self.layout.check_return_type
+
+    @property
+    def return_test(self):
+        return self.layout.return_test
+
+    @property
+    def fn_name(self):
+        return get_fn_name(self.func)
+
+    @property
+    def qualname(self):
+        fn = self.func
+        return f"{getattr(fn, '__module__', None)}.{getattr(fn, '__qualname__', self.fn_name)}"
+
+    def apply_sampling(self):
+        """ Installs a sampler following the decorator or the global setting """
+        sampling = self.sampling or GLOBAL_SAMPLING
+        if sampling["every"] is None and sampling["rate"] is None:
+            self.sampler = None
+        else:
+            self.sampler = Sampler(**sampling)
+        # The generated wrapper reads these as globals. Calls running in
+        # other threads may still see the flag set, so the sampler is
+        # installed before the flag is set, and never taken away.
+        if self.sampler is not None:
+            self.namespace[generated("sample")] = self.sampler.sample
+        self.namespace[generated("sampling")] = self.sampler is not None
+
+    def apply_stats(self):
+        """ Turns the stats on or off following the decorator or the
+            global setting, swapping the code of a generated wrapper
+            so that functions without stats pay nothing for them.
         """
-        params, defaults = get_fn_param(fn)
-        params = { param : UNSET for param in params }
+        enabled = GLOBAL_STATS["enabled"] if self.stats_setting is None else self.stats_setting
+        if enabled == (self.stats is not None):
+            return
+        self.stats = FunctionStats(len(self.checks) + (self.check_return_type is not TypeCheckerUnset)) \
+                     if enabled else None
+        if self.wrapper is not None and self.namespace.get(f"{GENERATED_PREFIX}func") is not None:
+            self.wrapper.__code__ = generate_function(self.func, self, enabled)
 
-        # Add argument values
-        for param, arg in zip(params, args):
-            params[param] = arg
+    def param_error(self, param, value, arg_type):
+        """ Raises (or reports) the TypeError for a value that failed its check """
+        self.failure(param, arg_type, value)
 
-        # Add kwarg values
-        for param in kwargs:
-            params[param] = kwargs[param]
+    def return_error(self, result):
+        """ Raises (or reports) the TypeError for a return value that failed its check """
+        self.failure("return", self.check_return_type, result)
 
-        # Check for UNSET, if UNSET and in defaults
-        # set to IGNORE
-        for param, value in params.items():
-            if value != UNSET:
-                continue
+    def yield_error(self, item):
+        """ Raises (or reports) the TypeError for a yielded value that failed its check """
+        self.failure("yield", self.check_yield_type, item)
 
-            if param not in defaults:
-                tc_error(f"The parameter '{param}' got no value")
+    def failure(self, param, arg_type, value, function=None):
+        """ Raises the ArgumentTypeError for a failed check, or in the 'log'
+            and hook modes reports it, and lets the call go on.
 
-            params[param] = IGNORE
+            Reports are deduplicated by (parameter, actual type), and
+            each is reported at most once per interval, with the number
+            of violations suppressed since its last report.
+        """
+        stats = self.stats # Read once, set_stats may run in another thread
+        if stats is not None:
+            stats.failed(param)
 
-        return params
+        mode = self.mode_setting or GLOBAL_MODE["mode"]
+        if mode == "raise":
+            raise self.make_error(param, arg_type, value, function)
 
-    def parse_arg(parse_arg):
-        """ Convert input to manageable type
+        reports = self.reports
+        if reports is None:
+            reports = self.reports = {}
+        key = (function, param, type(value))
+        now = time.monotonic()
+        window = reports.get(key)
+        interval = self.interval_setting
+        if interval is None:
+            interval = GLOBAL_MODE["interval"]
+        if window is not None and now - window[0] < interval:
+            window[1] += 1
+            return
+        suppressed = 0 if window is None else window[1]
+        if len(reports) >= MAX_REPORT_KEYS:
+            reports.clear()
+        reports[key] = [now, 0]
 
-            If no types given, leave as it is;
-            If class insert into sub-list;
-            If function set to callable check;
-            If string 'pass' set to IGNORE
-            If tuple leave it
-            Else send primitive type as string;
+        error = self.make_error(param, arg_type, value, function)
+        if mode == "log":
+            import logging
+            logging.getLogger("typechecker").warning(
+                "%s (%d similar violations suppressed)", error, suppressed)
+        else:
+            mode(error, suppressed)
+
+    def make_error(self, param, arg_type, value, function=None):
+        """ Returns the ArgumentTypeError of a failed check, in function
+            (by default the decorated function)
         """
-        return      parse_arg if str(parse_arg).startswith("<function") else \
-                    IGNORE if parse_arg == "pass" else \
-                    pass_filter(parse_arg) if isinstance(parse_arg, tuple) else \
-                    [parse_arg] if str(parse_arg).startswith("<class '__main__.") else \
-                    'callable' if str(parse_arg) == '<built-in function callable>' else \
-                    str(parse_arg).replace("<class '", "").replace("'>", "")
+        function = function or self.fn_name
+        if param == "return":
+            return ArgumentTypeError(function, None, arg_type, value)
+        if param == "yield":
+            return ArgumentTypeError(function, None, arg_type, value, yielded=True)
+        return ArgumentTypeError(function, param, arg_type, value)
 
+    def wrap_result(self, result):
+        """ Returns the result of the function, with the items of
+            generators checked as they are yielded
+        """
+        return self.yield_wrapper(self, result)
 
-    def wrapper(func):
+    def missing_error(self, param):
+        """ Raises the TypeCheckError for a parameter without value """
+        raise TypeCheckError(f"The parameter '{param}' got no value", self.fn_name, param)
+
+class CheckedItems:
+    """ Base of the generator wrappers, checking the items yielded
+        (every item, or one in every check_yield_every items).
+    """
+
+    __slots__ = ("plan", "gen", "type", "test", "every", "count")
+
+    def __init__(self, plan, gen):
+        self.plan = plan
+        self.gen = gen
+        self.type = plan.check_yield_type if plan.yield_isinstance else None
+        self.test = plan.yield_test
+        self.every = plan.check_yield_every
+        self.count = 0
+
+    def check(self, item):
+        if self.every == 1:
+            if not self.test(item):
+                self.plan.yield_error(item)
+        else:
+            count = self.count
+            self.count = count + 1
+            if count % self.every == 0 and not self.test(item):
+                self.plan.yield_error(item)
+        return item
+
+    def __getattr__(self, name):
+        return getattr(self.gen, name) # gi_frame, ag_running, ...
+
+class CheckedGenerator(CheckedItems):
+    """ Wraps a generator, checking the items it yields as they
+        stream. send, throw and close are forwarded to the generator.
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self.gen)
+        if self.type is None:
+            return self.check(item)
+        if not isinstance(item, self.type):
+            self.plan.yield_error(item)
+        return item
+
+    def send(self, value):
+        return self.check(self.gen.send(value))
+
+    def throw(self, *args):
+        return self.check(self.gen.throw(*args))
+
+    def close(self):
+        return self.gen.close()
+
+class CheckedAsyncGenerator(CheckedItems):
+    """ Wraps an async generator, checking the items it yields as
+        they stream. asend, athrow and aclose are forwarded.
+    """
+
+    __slots__ = ()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return self.check(await self.gen.__anext__())
+
+    async def asend(self, value):
+        return self.check(await self.gen.asend(value))
+
+    async def athrow(self, *args):
+        return self.check(await self.gen.athrow(*args))
+
+    def aclose(self):
+        return self.gen.aclose()
+
+Generator.register(CheckedGenerator)
+AsyncGenerator.register(CheckedAsyncGenerator)
+
+def loop_wrapper(func, plan):
+    """ Returns a wrapper that walks the plan on every call.
+
+        Works for any signature, and is used when a
+        specialized wrapper can't be generated.
+    """
+    checks = plan.checks
+    required = plan.required
+    n_required = plan.layout.n_required_positional
+    has_required_kwonly = plan.layout.has_required_kwonly
+    check_return_type = plan.check_return_type
+    return_test = plan.return_test
+
+    def check_call(args, kwargs):
+        """ Performs the type checking of the arguments, returns
+            False if the call was skipped by the sampler
+        """
+
+        nargs = len(args)
+        if nargs < n_required or has_required_kwonly:
+            for index, param in required:
+                if (index is None or index >= nargs) and param not in kwargs:
+                    plan.missing_error(param)
+
+        sampler = plan.sampler
+        if sampler is not None and not sampler():
+            return False
+
+        for index, param, arg_type, test in checks:
+            if index is not None and index < nargs:
+                value = args[index]
+            elif param in kwargs:
+                value = kwargs[param]
+            else:
+                continue # Default value used, nothing to check
+
+            if test is None:
+                if not isinstance(value, arg_type):
+                    plan.param_error(param, value, arg_type)
+            elif not test(value):
+                plan.param_error(param, value, arg_type)
+        return True
+
+    def check_result(result):
+        if check_return_type is not TypeCheckerUnset:
+            if not (isinstance(result, check_return_type) if return_test is None else return_test(result)):
+                plan.return_error(result)
+        if plan.yield_wrapper is not None:
+            return plan.wrap_result(result)
+        return result
+
+    clock = time.perf_counter_ns
+
+    if has_code_flag(func, CO_COROUTINE):
+        @wraps(func)
+        async def typechecking(*args, **kwargs):
+            """ Performs the type checking """
+            stats = plan.stats
+            if stats is None:
+                if not check_call(args, kwargs):
+                    return await func(*args, **kwargs)
+                return check_result(await func(*args, **kwargs))
+
+            stats.calls += 1
+            start = clock()
+            if not check_call(args, kwargs):
+                return await func(*args, **kwargs)
+            stats.checked += 1
+            called = clock()
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                returned = clock()
+                stats.call_ns += returned - called
+            result = check_result(result)
+            stats.check_ns += called - start + clock() - returned
+            return result
+    else:
         @wraps(func)
         def typechecking(*args, **kwargs):
             """ Performs the type checking """
+            stats = plan.stats
+            if stats is None:
+                if not check_call(args, kwargs):
+                    return func(*args, **kwargs)
+                return check_result(func(*args, **kwargs))
 
-            check_types = setup_param_dict(func, check_args, check_kwargs)
-            values = unify_values(func, args, kwargs)
-            # check_types and values are now dictionaries containing the
-            # same keys, now just check that the values are correct.
-
-            for param in check_types:
-                if check_types[param] == IGNORE or values[param] == IGNORE:
-                    continue
-                elif check_types[param] == 'callable':
-                    if not callable(values[param]):
-                        t_error(f"The value '{values[param]}' sent to parameter '{param}' "\
-                                f"of function '{get_fn_name(func)}' is of type {type(values[param])}, expected callable")
-                else:
-                     if not isinstance(check_types[param], (list, tuple)): # If not class or tuple of optional types
-                         arg_type = locate(check_types[param]) # Convert check type string to checkable type
-                         if arg_type is None:
-                             arg_type = type(None)
-                     else:
-                         if isinstance(check_types[param], list): # If class instance
-                             arg_type = check_types[param][0]
-                         else:
-                             arg_type = tuple(check_types[param]) # If optional types
-
-                     if not isinstance(values[param], arg_type):
-                         t_error(f"The value '{values[param]}' sent to parameter '{param}' "\
-                                 f"of function '{get_fn_name(func)}' is of type {type(values[param])}, expected type {arg_type}")
-
-            result = func(*args, **kwargs)
-
-            if check_return_type is not TypeCheckerUnset and not isinstance(result, check_return_type):
-                t_error(f"The value '{result}' returned from function '{get_fn_name(func)}' is of type {type(result)}, "\
-                f"expected type {check_return_type}")
-            else:
-                return result
+            stats.calls += 1
+            start = clock()
+            if not check_call(args, kwargs):
+                return func(*args, **kwargs)
+            stats.checked += 1
+            called = clock()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                returned = clock()
+                stats.call_ns += returned - called
+            result = check_result(result)
+            stats.check_ns += called - start + clock() - returned
+            return result
+
+    return typechecking
+
+GENERATED_PREFIX = "_tc_"
 
+def generated(name):
+    """ Returns the generated global GENERATED_PREFIX + name, interned
+        so that the namespaces of all the wrappers share the string
+    """
+    return sys.intern(GENERATED_PREFIX + name)
+
+def can_generate(plan):
+    """ Returns True if a specialized wrapper can be generated for plan """
+    return not any(param.name.startswith(GENERATED_PREFIX) for param in plan.parameters)
+
+# The wrapper returned when decorating, generating its real code on the
+# first call, so that decorating compiles nothing (e.g. when a module of
+# decorated functions is imported by every worker of a process pool)
+STUBS = {}
+exec("def typechecking(*args, **kwargs):\n"
+     f"    return {GENERATED_PREFIX}build({GENERATED_PREFIX}plan)(*args, **kwargs)\n"
+     "async def async_typechecking(*args, **kwargs):\n"
+     f"    return await {GENERATED_PREFIX}build({GENERATED_PREFIX}plan)(*args, **kwargs)\n", STUBS)
+
+def generated_wrapper(func, plan):
+    """ Returns a wrapper generated for the exact signature of func.
+
+        Every parameter gets the UNSET sentinel as default, so that
+        missing values and default values can be told apart, and
+        each check becomes a straight-line isinstance call on a
+        local variable, e.g. for @typecheck(int) on def foo(a, b=1):
+
+            def foo(a=_tc_UNSET, b=_tc_UNSET):
+                if a is _tc_UNSET: _tc_plan.missing_error('a')
+                if not _tc_isinstance(a, _tc_type_0): _tc_plan.failure('a', _tc_type_0, a)
+                return _tc_func(a, _tc_default_1 if b is _tc_UNSET else b)
+
+        The code only refers to the function's own objects through
+        the globals of the wrapper (plan.namespace), so that functions
+        with the same layout share one code object.
+
+        It starts as a stub taking any arguments, and the generated
+        code replaces the stub's code on the first call (see build).
+    """
+    stub = STUBS["async_typechecking" if has_code_flag(func, CO_COROUTINE) else "typechecking"]
+    plan.namespace[generated("build")] = build
+    plan.namespace[generated("plan")] = plan
+    return wraps(func)(types.FunctionType(stub.__code__, plan.namespace, stub.__name__))
+
+def build(plan):
+    """ Generates the code of plan.wrapper and swaps it in, returning
+        the wrapper. Threads calling the stub at once all build the
+        same code, and the code is swapped last, so that no call
+        sees the new code with the stub's defaults.
+    """
+    code = generate_function(plan.func, plan, plan.stats is not None)
+    wrapper = plan.wrapper
+    defaults, kwdefaults = [], {}
+    for param in plan.parameters:
+        if param.kind == param.KEYWORD_ONLY:
+            kwdefaults[param.name] = UNSET
+        elif param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            defaults.append(UNSET)
+    wrapper.__defaults__ = tuple(defaults) or None
+    wrapper.__kwdefaults__ = kwdefaults or None
+    wrapper.__code__ = code
+    return wrapper
+
+def is_inline_literal(check):
+    """ Returns True if check is a LiteralCheck that generated code tests inline """
+    return isinstance(check, LiteralCheck) and check.keys is None
+
+def inline_literal(check, name, index, namespace):
+    """ Returns the inline test of a LiteralCheck of a single type, a
+        type comparison and a frozenset membership test.
+    """
+    namespace[generated("type")] = type
+    namespace[generated(f"literal_type_{index}")], = check.types
+    namespace[generated(f"members_{index}")] = check.members
+    p = GENERATED_PREFIX
+    return f"({p}type({name}) is {p}literal_type_{index} and {name} in {p}members_{index})"
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def compile_wrapper(source):
+    """ Returns the code of the function defined by source, compiled
+        once for all the functions generating the same source.
+    """
+    module = compile(source, "<typecheck>", "exec")
+    return next(const for const in module.co_consts if isinstance(const, types.CodeType))
+
+def generate_function(func, plan, instrumented):
+    """ Generates the code of generated_wrapper, with or without the
+        instrumentation recording its stats, and adds the objects it
+        refers to to the namespace of the wrapper.
+    """
+    p = GENERATED_PREFIX
+    namespace = plan.namespace
+    namespace[generated("func")] = func
+
+    signature_params = plan.parameters
+    last_positional_only = max((index for index, param in enumerate(signature_params)
+                                if param.kind == param.POSITIONAL_ONLY), default=None)
+    required = {name for _, name in plan.required}
+
+    params, call, missing, checks, returns = [], [], [], [], []
+    kwonly_started = False
+    for index, param in enumerate(signature_params):
+        name = param.name
+        if param.kind == param.VAR_POSITIONAL:
+            params.append(f"*{name}")
+            call.append(f"*{name}")
+            kwonly_started = True
+            continue
+        if param.kind == param.VAR_KEYWORD:
+            params.append(f"**{name}")
+            call.append(f"**{name}")
+            continue
+        if param.kind == param.KEYWORD_ONLY and not kwonly_started:
+            params.append("*")
+            kwonly_started = True
+
+        namespace[generated("UNSET")] = UNSET
+        params.append(name)
+        if index == last_positional_only:
+            params.append("/")
+
+        value = name
+        if param.default is param.empty:
+            missing.append(f"if {name} is {p}UNSET: {p}plan.missing_error({name!r})")
+        else:
+            namespace[generated(f"default_{index}")] = param.default
+            value = f"({p}default_{index} if {name} is {p}UNSET else {name})"
+        call.append(f"{name}={value}" if param.kind == param.KEYWORD_ONLY else value)
+
+    for index, (_, name, arg_type, test) in enumerate(plan.checks):
+        namespace[generated(f"type_{index}")] = arg_type
+        guard = "" if name in required else f"{name} is not {p}UNSET and "
+        cache = getattr(test, "__self__", None)
+        if test is None:
+            namespace[generated("isinstance")] = isinstance
+            test = f"{p}isinstance({name}, {p}type_{index})"
+        elif is_inline_literal(cache):
+            test = inline_literal(cache, name, index, namespace)
+        elif isinstance(cache, OptionsCheck) and len(cache.tests) == 1 and \
+                is_inline_literal(getattr(cache.tests[0], "__self__", None)):
+            # Optional[Literal[...]] and the like, the types then the literal
+            namespace[generated("isinstance")] = isinstance
+            namespace[generated(f"options_{index}")] = cache.types
+            literal = inline_literal(cache.tests[0].__self__, name, index, namespace)
+            test = f"({p}isinstance({name}, {p}options_{index}) or {literal})"
+        elif isinstance(cache, VerdictCache):
+            # Types seen before cost a dict lookup, no call to the cache
+            namespace[generated(f"verdicts_{index}")] = cache.verdicts
+            namespace[generated(f"test_{index}")] = test
+            namespace[generated("id")] = id
+            namespace[generated("type")] = type
+            test = f"({p}verdicts_{index}.get({p}id({p}type({name}))) or {p}test_{index}({name}))"
+        else:
+            namespace[generated(f"test_{index}")] = test
+            test = f"{p}test_{index}({name})"
+        checks.append(f"if {guard}not {test}: {p}plan.failure({name!r}, {p}type_{index}, {name})")
+
+    # Coroutine functions get an async wrapper awaiting the result
+    is_async = has_code_flag(func, CO_COROUTINE)
+    invoke = f"{'await ' if is_async else ''}{p}func({', '.join(call)})"
+
+    if plan.check_return_type is not TypeCheckerUnset:
+        namespace[generated("return_type")] = plan.check_return_type
+        if plan.return_test is None:
+            namespace[generated("isinstance")] = isinstance
+            test = f"{p}isinstance({p}result, {p}return_type)"
+        else:
+            namespace[generated("return_test")] = plan.return_test
+            test = f"{p}return_test({p}result)"
+        returns.append(f"if not {test}: {p}plan.failure('return', {p}return_type, {p}result)")
+    if plan.yield_wrapper is not None:
+        result = f"{p}plan.wrap_result({p}result)"
+    else:
+        result = f"{p}result"
+
+    # Calls skipped by the sampler go straight to func
+    gate = [f"if {p}sampling and not {p}sample(): return {invoke}"]
+
+    if instrumented:
+        namespace[generated("stats")] = plan.stats
+        namespace[generated("clock")] = time.perf_counter_ns
+        body = [f"{p}stats.calls += 1", *missing, *gate,
+                f"{p}start = {p}clock()",
+                *checks,
+                f"{p}stats.checked += 1",
+                f"{p}called = {p}clock()",
+                "try:",
+                f"    {p}result = {invoke}",
+                "finally:",
+                f"    {p}returned = {p}clock()",
+                f"    {p}stats.call_ns += {p}returned - {p}called",
+                *returns,
+                f"{p}stats.check_ns += {p}called - {p}start + {p}clock() - {p}returned",
+                f"return {result}"]
+    elif not returns and plan.yield_wrapper is None:
+        body = [*missing, *gate, *checks, f"return {invoke}"]
+    else:
+        body = [*missing, *gate, *checks, f"{p}result = {invoke}", *returns, f"return {result}"]
+
+    source = f"{'async ' if is_async else ''}def typechecking({', '.join(params)}):\n" + \
+             "".join(f"    {line}\n" for line in body)
+    return compile_wrapper(source)
+
+def typecheck(*check_args, check_return_type=TypeCheckerUnset,
+              check_every=None, check_rate=None, check_elements="full",
+              check_yield_type=TypeCheckerUnset, check_yield_every=1, check_stats=None,
+              check_mode=None, **check_kwargs):
+    """
+        Checks that arguments passed to function
+        is of the type passed to the type checker.
+
+        With check_every=N only one in every N calls is checked,
+        and with check_rate=K at most K calls per second are checked,
+        the other calls are passed straight through to the function.
+
+        check_elements selects how the elements of container specs,
+        such as list[int], are checked: 'full', 'edges' or 'random',
+        optionally as a (strategy, k) tuple.
+
+        check_yield_type checks the items yielded by generator and
+        async generator functions as they stream, every item or one
+        in every check_yield_every items.
+
+        check_stats=True records call counts, failures and the time
+        spent checking, see stats_snapshot.
+
+        check_mode='log' logs failed checks instead of raising, and a
+        callable check_mode is called with each failure, in both cases
+        the call goes on, see set_mode.
+
+        In modules disabled by TYPECHECK_DISABLE (or set_disabled) the
+        function is returned unchanged, see checked_functions.
+    """
+
+    def wrapper(func):
+        if is_disabled(func):
+            return strip(func)
+        plan = CheckPlan(func, check_args, check_kwargs, check_return_type,
+                         check_every, check_rate, check_elements,
+                         check_yield_type, check_yield_every, check_stats, check_mode)
+        if can_generate(plan):
+            typechecking = generated_wrapper(func, plan)
+        else:
+            typechecking = loop_wrapper(func, plan)
+        plan.wrapper = typechecking
+        plan.apply_sampling()
+        typechecking.__typecheck_plan__ = plan
         return typechecking
 
     def nocheckwrapper(func):
         """ If no given checks, just run func and return value """
-        @wraps(func)
-        def some_func(*args, **kwargs):
-            return func(*args, **kwargs)
+        if has_code_flag(func, CO_COROUTINE):
+            @wraps(func)
+            async def some_func(*args, **kwargs):
+                return await func(*args, **kwargs)
+        else:
+            @wraps(func)
+            def some_func(*args, **kwargs):
+                return func(*args, **kwargs)
         return some_func
 
-    if len(check_args) == 1 and callable(parse_arg(check_args[0])):
+    if is_bare_decorator(check_args, check_kwargs):
+        if is_disabled(check_args[0]):
+            return strip(check_args[0])
         return nocheckwrapper(check_args[0])
     else:
         return wrapper
 
+def all_plans():
+    """ Returns the plans of all decorated functions, safe against
+        functions being decorated in other threads.
+    """
+    with PLANS_LOCK:
+        return list(PLANS)
+
+def get_plan(func):
+    """ Returns the check plan of a function decorated by typecheck """
+    plan = getattr(func, "__typecheck_plan__", None)
+    if plan is None:
+        tc_error(f"The function '{func}' is not checked by typecheck")
+    return plan
+
+def set_sampling(every=None, rate=None, func=None):
+    """ Sets which calls are checked, at runtime.
+
+        Checks one in every calls, or at most rate calls per second.
+        Given func, only that function is changed, otherwise the
+        global setting used by all functions that were not given
+        check_every or check_rate is changed. Leaving out both every
+        and rate goes back to checking every call (or, for func, to
+        the global setting).
+    """
+    if every is not None or rate is not None:
+        Sampler(every, rate) # Report bad settings before changing anything
+
+    if func is not None:
+        plan = get_plan(func)
+        plan.sampling = None if every is None and rate is None else {"every" : every, "rate" : rate}
+        plan.apply_sampling()
+        return
+
+    GLOBAL_SAMPLING.update(every=every, rate=rate)
+    for plan in all_plans():
+        if plan.sampling is None:
+            plan.apply_sampling()
+
+def sampling_stats(func):
+    """ Returns the number of checked and skipped calls of func,
+        counted since its sampling was last set. Calls are only
+        counted while func is sampled.
+    """
+    sampler = get_plan(func).sampler
+    if sampler is None:
+        return {"checked" : None, "skipped" : None}
+    return {"checked" : sampler.checked, "skipped" : sampler.skipped}
+
+def type_only_test(check_type):
+    """ Returns a test for checks whose verdict only depends on the
+        type of the value, so it can be reused for every value of
+        the same type, or None if the check depends on the value.
+    """
+    if check_type is callable:
+        return callable
+    if isinstance(check_type, LazyType):
+        check_type = check_type.resolve()
+    if isinstance(check_type, OptionsCheck):
+        tests = [type_only_test(option) for option in check_type.options]
+        if any(test is None for test in tests):
+            return None
+        return lambda value: any(test(value) for test in tests)
+    if compile_check(check_type) is None:
+        return lambda value: isinstance(value, check_type)
+    return None
+
+def batch_column(rows, position, param, min_length):
+    """ Returns the values given to param in each row, UNSET if none.
+        min_length is the length of the shortest row if all rows
+        are tuples, or None otherwise.
+    """
+    if position is not None and min_length is not None and position < min_length:
+        return list(map(itemgetter(position), rows))
+    if position is None:
+        return [row.get(param, UNSET) if isinstance(row, dict) else UNSET for row in rows]
+    return [row.get(param, UNSET) if isinstance(row, dict) else
+            row[position] if position < len(row) else UNSET for row in rows]
+
+def validate_batch(func, rows):
+    """ Checks many rows of arguments against the checks of func,
+        without calling func.
+
+        func must be decorated by typecheck, and each row is either a
+        tuple of arguments or a dict of keyword arguments. The rows are
+        checked one parameter column at a time, and checks that only
+        depend on the type of a value run once per distinct type.
+
+        Returns a list with True for each row that passed, and False
+        for each row that failed (including rows with arguments that
+        func doesn't take), no TypeError is raised.
+    """
+    plan = get_plan(func)
+    rows = rows if isinstance(rows, list) else list(rows)
+    passed = [True] * len(rows)
+    if not rows:
+        return passed
+
+    row_types = set(map(type, rows))
+    min_length = None if any(issubclass(row_type, dict) for row_type in row_types) \
+                 else min(map(len, rows))
+
+    for position, param in plan.required:
+        if position is not None and min_length is not None and position < min_length:
+            continue # Every row has a value
+        for row, value in enumerate(batch_column(rows, position, param, min_length)):
+            if value is UNSET:
+                passed[row] = False
+
+    # Rows with more arguments than func takes, unless it has *args or **kwargs
+    parameters = get_parameters(plan.func)
+    kinds = {param.kind for param in parameters}
+    params, _ = get_fn_param(parameters)
+    if Parameter.VAR_POSITIONAL not in kinds:
+        n_positional = sum(position is not None for _, position in params)
+        for row, values in enumerate(rows):
+            if not isinstance(values, dict) and len(values) > n_positional:
+                passed[row] = False
+    if Parameter.VAR_KEYWORD not in kinds:
+        # Positional-only parameters can't be given by keyword
+        names = {param.name for param in parameters
+                 if param.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)}
+        for row, values in enumerate(rows):
+            if isinstance(values, dict) and not names.issuperset(values):
+                passed[row] = False
+
+    for position, param, check_type, test in plan.checks:
+        type_test = type_only_test(check_type)
+        if type_test is None:
+            for row, value in enumerate(batch_column(rows, position, param, min_length)):
+                if value is not UNSET and not test(value):
+                    passed[row] = False
+            continue
+
+        if position is not None and min_length is not None and position < min_length:
+            # The common case, every row is a tuple holding a value of the same type
+            distinct = set(map(type, map(itemgetter(position), rows)))
+            if len(distinct) == 1:
+                if not type_test(rows[0][position]):
+                    passed = [False] * len(rows)
+                continue
+
+        # One value of each distinct type decides for all values of that type
+        column = batch_column(rows, position, param, min_length)
+        value_types = list(map(type, column))
+        failed = {value_type for value_type in set(value_types)
+                  if value_type is not TypeCheckerUnset and
+                  not type_test(column[value_types.index(value_type)])}
+        if failed:
+            for row, value_type in enumerate(value_types):
+                if value_type in failed:
+                    passed[row] = False
+
+    return passed
+
+def get_hints(fn, check_elements, localns=None):
+    """ Returns the type hints of fn, evaluated once.
+
+        Hints that can't be evaluated yet are returned as LazyHints,
+        evaluated when they are first checked.
+    """
+    import typing
+    try:
+        return typing.get_type_hints(fn, localns=localns)
+    except NameError:
+        pass
+
+    hints = {}
+    for name, hint in getattr(fn, "__annotations__", {}).items():
+        if isinstance(hint, str):
+            try:
+                hint = eval(hint, globals_of(fn), localns)
+            except NameError:
+                hint = LazyHint(hint, fn, check_elements, localns)
+        hints[name] = hint
+    return hints
+
+def from_hints(func=None, **options):
+    """ Checks the arguments and return value of func against its
+        type hints, instead of types given to the decorator.
+
+        Used as @typecheck.from_hints, or with the options of
+        typecheck as @typecheck.from_hints(check_every=10). The hints
+        are read once, and compiled into the same checks as explicit
+        types, parameters without hints are not checked, and neither
+        are *args and **kwargs, whose hints are ignored.
+
+        Used on a class, all methods of the class are checked (see
+        check_class).
+    """
+    if func is None:
+        return partial(from_hints, **options)
+    if isinstance(func, type):
+        return check_class(func, **options)
+    return check_hints(func, options)
+
+def check_hints(func, options, localns=None):
+    """ Returns func decorated by typecheck with its type hints
+        as checks, evaluating the hints with localns as locals.
+    """
+    if is_disabled(func):
+        return strip(func) # Without evaluating the hints
+    hints = get_hints(func, options.get("check_elements", "full"), localns)
+    check_return_type = hints.pop("return", TypeCheckerUnset)
+    params, _ = get_fn_param(get_parameters(func))
+    checks = {param : hints[param] for param, _ in params if param in hints}
+    return typecheck(check_return_type=check_return_type, **options, **checks)(func)
+
+def check_class(cls, **options):
+    """ Checks all methods of cls against their type hints.
+
+        Walks the class once and replaces each instance method, class
+        method, static method and property accessor that has type
+        hints with its checking wrapper. As self and cls have no
+        hints they are never checked. Methods that are already
+        decorated by typecheck are left as they are.
+
+        A summary of the compiled checks is stored on the class,
+        see class_summary.
+    """
+    def compile_method(fn):
+        """ Returns (wrapper, number of checks), or (fn, 0) if not checked """
+        if not isinstance(fn, types.FunctionType) or hasattr(fn, "__typecheck_plan__") or \
+                not getattr(fn, "__annotations__", None):
+            return fn, 0
+        # The class is not yet bound to its name when decorating
+        wrapper = check_hints(fn, options, {cls.__name__ : cls})
+        if wrapper is fn:
+            return fn, 0 # Disabled
+        plan = get_plan(wrapper)
+        return wrapper, len(plan.checks) + (plan.check_return_type is not TypeCheckerUnset)
+
+    summary = {"methods" : {}, "checks" : 0, "compile_ns" : 0}
+    start = time.perf_counter_ns()
+
+    for name, attr in list(vars(cls).items()):
+        method_start = time.perf_counter_ns()
+        if isinstance(attr, staticmethod):
+            kind = "static"
+            fn, checks = compile_method(attr.__func__)
+            new_attr = staticmethod(fn)
+        elif isinstance(attr, classmethod):
+            kind = "class"
+            fn, checks = compile_method(attr.__func__)
+            new_attr = classmethod(fn)
+        elif isinstance(attr, property):
+            kind = "property"
+            accessors = [compile_method(accessor) for accessor in (attr.fget, attr.fset, attr.fdel)]
+            checks = sum(count for _, count in accessors)
+            new_attr = property(*(accessor for accessor, _ in accessors), attr.__doc__)
+        else:
+            kind = "instance"
+            new_attr, checks = compile_method(attr)
+
+        if not checks:
+            continue
+        setattr(cls, name, new_attr)
+        summary["methods"][name] = {
+            "kind" : kind,
+            "checks" : checks,
+            "compile_ns" : time.perf_counter_ns() - method_start,
+        }
+        summary["checks"] += checks
+
+    summary["compile_ns"] = time.perf_counter_ns() - start
+    cls.__typecheck_summary__ = summary
+    return cls
+
+def class_summary(cls):
+    """ Returns the summary of the checks compiled by check_class:
+        the checks and compile time of each checked method, and the
+        totals for the class.
+    """
+    summary = vars(cls).get("__typecheck_summary__")
+    if summary is None:
+        tc_error(f"The class '{cls}' is not checked by typecheck")
+    return summary
+
+def record_fields(cls, check_elements):
+    """ Returns the fields of the record class cls, as a list of
+        (name, hint, default, factory, init, kw_only) tuples, read
+        from the dataclass fields of a dataclass, or else from the
+        annotations of the class and its bases, defaults being the
+        class attributes. Missing defaults and factories are UNSET.
+    """
+    hints = get_hints(cls, check_elements, {cls.__name__ : cls})
+    if "__dataclass_fields__" in vars(cls):
+        import dataclasses
+        fields = []
+        for field in cls.__dataclass_fields__.values():
+            if field._field_type is dataclasses._FIELD_INITVAR:
+                tc_error(f"The InitVar field '{field.name}' of record '{cls.__name__}' is not supported")
+            if field._field_type is not dataclasses._FIELD:
+                continue # ClassVar
+            fields.append((field.name, hints.get(field.name, IGNORE),
+                           UNSET if field.default is dataclasses.MISSING else field.default,
+                           UNSET if field.default_factory is dataclasses.MISSING else field.default_factory,
+                           field.init, bool(getattr(field, "kw_only", False))))
+        return fields
+
+    import typing
+    fields = []
+    for name, hint in hints.items():
+        if hint is typing.ClassVar or getattr(hint, "__origin__", None) is typing.ClassVar:
+            continue
+        default = getattr(cls, name, UNSET)
+        if isinstance(default, types.MemberDescriptorType): # A slot
+            default = UNSET
+        fields.append((name, hint, default, UNSET, True, False))
+    return fields
+
+def record_source(cls, fields, assign):
+    """ Returns the source of the unchecked __init__ of a record,
+        setting each field with assign(name, value expression).
+    """
+    p = GENERATED_PREFIX
+    params, body, kwonly = ["self"], [], []
+    seen_default = False
+    for index, (name, _, default, factory, init, kw_only) in enumerate(fields):
+        if name.startswith(p):
+            tc_error(f"The field '{name}' of record '{cls.__name__}' can't start with '{p}'")
+        has_default = default is not UNSET or factory is not UNSET
+        if not init:
+            if factory is not UNSET:
+                body.append(assign(name, f"{p}factory_{index}()"))
+            elif default is not UNSET:
+                body.append(assign(name, f"{p}default_{index}"))
+            continue
+
+        param = name
+        if factory is not UNSET:
+            param = f"{name}={p}UNSET"
+            body.append(assign(name, f"{p}factory_{index}() if {name} is {p}UNSET else {name}"))
+        else:
+            if default is not UNSET:
+                param = f"{name}={p}default_{index}"
+            body.append(assign(name, name))
+
+        if kw_only:
+            kwonly.append(param)
+            continue
+        if seen_default and not has_default:
+            tc_error(f"The field '{name}' of record '{cls.__name__}' has no default but follows fields with defaults")
+        seen_default = seen_default or has_default
+        params.append(param)
+
+    if kwonly:
+        params += ["*", *kwonly]
+    if hasattr(cls, "__post_init__"):
+        body.append("self.__post_init__()")
+    return f"def __init__({', '.join(params)}):\n" + \
+           "".join(f"    {line}\n" for line in body or ["pass"])
+
+def slotted(cls, fields):
+    """ Returns a copy of cls with __slots__ for its fields, the
+        defaults moving from the class to __init__.
+
+        As for @dataclass(slots=True), the copy is a new class: the
+        __class__ cells of its methods (used by super()) are pointed
+        at it, and the __init_subclass__ of its bases runs for it.
+    """
+    if "__slots__" in vars(cls):
+        tc_error(f"The record '{cls.__name__}' already has __slots__")
+    names = tuple(name for name, *_ in fields)
+    cls_dict = {key : value for key, value in vars(cls).items()
+                if key not in names and key not in ("__dict__", "__weakref__")}
+    cls_dict["__slots__"] = names
+    cls_dict["__qualname__"] = cls.__qualname__
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    for attr in vars(new_cls).values():
+        if isinstance(attr, property):
+            functions = (attr.fget, attr.fset, attr.fdel)
+        else:
+            functions = (getattr(attr, "__func__", attr),) # Unwrap class and static methods
+        for fn in functions:
+            set_class_cell(fn, cls, new_cls)
+    return new_cls
+
+def set_class_cell(fn, old_cls, new_cls):
+    """ Points the __class__ cell of fn (and of the functions it
+        wraps) from old_cls to new_cls, so that super() finds it.
+    """
+    while fn is not None:
+        code = getattr(fn, "__code__", None)
+        if code is not None and "__class__" in code.co_freevars:
+            cell = fn.__closure__[code.co_freevars.index("__class__")]
+            if cell.cell_contents is old_cls:
+                cell.cell_contents = new_cls
+        fn = getattr(fn, "__wrapped__", None)
+
+def record(cls=None, *, check_setattr=False, slots=False, **options):
+    """ Makes cls a validated record, generating an __init__ that
+        takes its fields and checks each against its type hint.
+
+        The fields are those of a dataclass (with their defaults,
+        default factories, init=False and kw_only, and __post_init__
+        is called), or else the annotations of a plain class, with
+        class attributes as defaults. The checks are compiled by
+        typecheck, which gets the other options (check_mode, ...).
+
+        check_setattr=True also generates a __setattr__ checking
+        assignments to fields after construction, and slots=True
+        gives a plain class __slots__ for its fields (for dataclasses
+        use @dataclass(slots=True)). Used as @typecheck.record or
+        @typecheck.record(check_setattr=True).
+    """
+    if cls is None:
+        return partial(record, check_setattr=check_setattr, slots=slots, **options)
+
+    fields = record_fields(cls, options.get("check_elements", "full"))
+    frozen = "__dataclass_fields__" in vars(cls) and cls.__dataclass_params__.frozen
+    if slots:
+        if "__dataclass_fields__" in vars(cls):
+            tc_error(f"Use @dataclass(slots=True) for the slots of record '{cls.__name__}'")
+        cls = slotted(cls, fields)
+    if frozen and check_setattr:
+        tc_error(f"The frozen record '{cls.__name__}' can't be assigned to")
+
+    p = GENERATED_PREFIX
+    base_setattr = cls.__setattr__
+    namespace = {f"{p}UNSET" : UNSET, f"{p}setattr" : object.__setattr__ if frozen else base_setattr}
+    for index, (_, _, default, factory, _, _) in enumerate(fields):
+        namespace[f"{p}default_{index}"] = default
+        namespace[f"{p}factory_{index}"] = factory
+
+    # Fields are set by the __setattr__ of the class when it isn't
+    # replaced, as the checks of __init__ already ran
+    if frozen or check_setattr:
+        assign = lambda name, value: f"{p}setattr(self, {name!r}, {value})"
+    else:
+        assign = lambda name, value: f"self.{name} = {value}"
+    exec(compile(record_source(cls, fields, assign), f"<typecheck record {cls.__name__}>", "exec"),
+         namespace)
+    init = namespace["__init__"]
+    init.__module__ = cls.__module__
+    init.__qualname__ = f"{cls.__qualname__}.__init__"
+
+    # Checks are given by position, as fields may use the names of options
+    hints = {name : hint for name, hint, *_ in fields}
+    params, _ = get_fn_param(get_parameters(init))
+    checks = [hints.get(name, IGNORE) if name != "self" else IGNORE for name, _ in params]
+    checks = ["pass" if check is IGNORE else check for check in checks]
+    cls.__init__ = typecheck(*checks, **options)(init)
+
+    if check_setattr and cls.__init__ is not init: # Unless disabled
+        cls.__setattr__ = record_setattr(cls, get_plan(cls.__init__), base_setattr)
+    return cls
+
+def record_setattr(cls, plan, base_setattr):
+    """ Returns a __setattr__ for a record, checking values assigned
+        to its fields with the checks of its __init__ plan.
+    """
+    p = GENERATED_PREFIX
+    namespace = {f"{p}isinstance" : isinstance, f"{p}setattr" : base_setattr}
+    lines = []
+    for index, (_, name, arg_type, test) in enumerate(plan.checks):
+        namespace[f"{p}type_{index}"] = arg_type
+        namespace[f"{p}test_{index}"] = test
+        namespace[f"{p}fail_{index}"] = partial(plan.failure, name, arg_type, function="__setattr__")
+        test = f"{p}isinstance(value, {p}type_{index})" if test is None else f"{p}test_{index}(value)"
+        lines.append(f"{'if' if not lines else 'elif'} name == {name!r}:\n"
+                     f"        if not {test}: {p}fail_{index}(value)")
+    source = "def __setattr__(self, name, value):\n" + \
+             "".join(f"    {line}\n" for line in lines) + \
+             f"    {p}setattr(self, name, value)\n"
+    exec(compile(source, f"<typecheck record {cls.__name__}>", "exec"), namespace)
+    setter = namespace["__setattr__"]
+    setter.__module__ = cls.__module__
+    setter.__qualname__ = f"{cls.__qualname__}.__setattr__"
+    return setter
+
+def set_stats(enabled=True, func=None):
+    """ Turns recording of stats on or off, at runtime.
+
+        Given func, only that function is changed (None going back
+        to the global setting), otherwise the global setting used by
+        all functions that were not given check_stats is changed.
+    """
+    if func is not None:
+        plan = get_plan(func)
+        plan.stats_setting = enabled
+        plan.apply_stats()
+        return
+
+    GLOBAL_STATS["enabled"] = bool(enabled)
+    for plan in all_plans():
+        if plan.stats_setting is None:
+            plan.apply_stats()
+
+def stats_snapshot():
+    """ Returns the stats of all functions recording them, as a dict
+        keyed by the qualified name of each function. Functions
+        sharing a name have their stats added together.
+    """
+    snapshot = {}
+    for plan in all_plans():
+        if plan.stats is None:
+            continue
+        stats = plan.stats.as_dict()
+        total = snapshot.get(plan.qualname)
+        if total is None:
+            snapshot[plan.qualname] = stats
+            continue
+        for key, value in stats.items():
+            if key == "failures":
+                for param, count in value.items():
+                    total[key][param] = total[key].get(param, 0) + count
+            else:
+                total[key] += value
+    return snapshot
+
+def reset_stats():
+    """ Sets the stats of all functions back to zero """
+    for plan in all_plans():
+        if plan.stats is not None:
+            plan.stats.reset()
+
+def dump_stats(file=None):
+    """ Returns the stats snapshot as JSON, also writing it to file if given """
+    import json
+    text = json.dumps(stats_snapshot(), indent=2, sort_keys=True)
+    if file is not None:
+        file.write(text)
+    return text
+
+def set_mode(mode=None, interval=None, func=None):
+    """ Sets what happens when a check fails, at runtime.
+
+        mode is 'raise' (raise the TypeError), 'log' (log a warning to
+        the 'typechecker' logger and go on) or a callable, called with
+        the ArgumentTypeError and the number of similar violations
+        suppressed since the last report, before going on. Reports
+        are made at most once per interval seconds for each parameter
+        and type of value.
+
+        Given func, only the mode or interval of that function is
+        changed (neither going back to the global ones), otherwise the
+        global mode and interval, used by all functions that were not
+        given their own, are changed.
+    """
+    if mode is not None:
+        parse_mode(mode)
+
+    if func is not None:
+        plan = get_plan(func)
+        if mode is None and interval is None:
+            plan.mode_setting = plan.interval_setting = None
+        if mode is not None:
+            plan.mode_setting = mode
+        if interval is not None:
+            plan.interval_setting = interval
+        plan.reports = None
+        return
+    if mode is not None:
+        GLOBAL_MODE["mode"] = mode
+    if interval is not None:
+        GLOBAL_MODE["interval"] = interval
+
+def set_disabled(*patterns):
+    """ Disables the checks of the modules matching the glob patterns,
+        in place of those of TYPECHECK_DISABLE, with no patterns
+        enabling all modules. Only changes the functions decorated
+        afterwards, the others keep their wrappers (use set_sampling
+        with every=0 to skip their checks).
+    """
+    GLOBAL_DISABLE.update(patterns=patterns, modules={})
+
+def checked_functions():
+    """ Returns the qualified names of the decorated functions that are
+        checked, and of those returned unchanged (stripped) because
+        their module is disabled.
+    """
+    return {
+        "checked" : sorted({plan.qualname for plan in all_plans()}),
+        "stripped" : sorted(STRIPPED),
+    }
+
+MAX_OBSERVED_TYPES = 8
+OBSERVE_EVERY = 100
+
+class TypeCounter(Check):
+    """ A check that always passes, counting the types of the values
+        it sees, for observe. At most MAX_OBSERVED_TYPES types are
+        counted, the values of any other type are counted in other.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.other = 0
+
+    def check(self, value):
+        cls = type(value)
+        counts = self.counts
+        count = counts.get(cls)
+        if count is not None:
+            counts[cls] = count + 1
+        elif len(counts) < MAX_OBSERVED_TYPES:
+            counts[cls] = 1
+        else:
+            self.other += 1
+        return True
+
+    def __str__(self):
+        return "any type (observed)"
+
+    def __reduce__(self):
+        return (TypeCounter, ()) # Each process counts its own calls
+
+def observe(func=None, *, every=None, rate=None):
+    """ Records the types of the arguments and return value of func,
+        to suggest its checks (see suggest_specs). Nothing is checked.
+
+        Only sampled calls are recorded, one in every calls (by default
+        one in OBSERVE_EVERY) or at most rate calls per second, the other
+        calls cost as much as a skipped check. Used as @typecheck.observe
+        or @typecheck.observe(rate=10).
+    """
+    if func is None:
+        return partial(observe, every=every, rate=rate)
+    if every is None and rate is None:
+        every = OBSERVE_EVERY
+    params, _ = get_fn_param(get_parameters(func))
+    return typecheck(*(TypeCounter() for _ in params), check_return_type=TypeCounter(),
+                     check_every=every, check_rate=rate)(func)
+
+def counted(counter):
+    """ Returns {type: count} of a TypeCounter, most common first """
+    counts = sorted(counter.counts.items(), key=itemgetter(1), reverse=True)
+    return dict(counts), counter.other
+
+def qualified_name(cls):
+    """ Returns the name of cls: its builtin name, None, or else its
+        dotted name, as resolved by types given by name.
+    """
+    if cls is type(None):
+        return "None"
+    if getattr(builtins, cls.__name__, None) is cls:
+        return cls.__name__
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+def type_name(cls):
+    """ Returns the source of cls as a spec, quoted unless builtin """
+    name = qualified_name(cls)
+    return name if name == "None" or "." not in name else repr(name)
+
+def observed_plans():
+    """ Returns the plans of the functions decorated by observe """
+    return [plan for plan in all_plans() if isinstance(plan.check_return_type, TypeCounter)]
+
+def observed():
+    """ Returns the types observed by observe, as a dict keyed by the
+        qualified name of each function, with the number of calls
+        observed and for each parameter and the return value, the
+        number of values of each type ("other" counting the types
+        over MAX_OBSERVED_TYPES).
+    """
+    report = {}
+    for plan in observed_plans():
+        returns, other = counted(plan.check_return_type)
+        entry = {"calls" : sum(returns.values()) + other, "params" : {}}
+        for _, param, counter, _ in plan.checks:
+            counts, other = counted(counter)
+            entry["params"][param] = {qualified_name(cls) : count for cls, count in counts.items()}
+            if other:
+                entry["params"][param]["other"] = other
+        returns = {qualified_name(cls) : count for cls, count in returns.items()}
+        entry["return"] = {**returns, "other" : other} if other else returns
+        report[plan.qualname] = entry
+    return report
+
+def suggest_spec(counter):
+    """ Returns the source of the spec of the observed types, or
+        None if there were none or too many
+    """
+    counts, other = counted(counter)
+    if not counts or other:
+        return None
+    names = [type_name(cls) for cls in counts]
+    return names[0] if len(names) == 1 else f"({', '.join(names)})"
+
+def suggest_specs(file=None):
+    """ Returns the typecheck decorators suggested by the types that
+        observe recorded, one per function, also writing them to file
+        if given. Parameters seen with no or too many types, and
+        self and cls, are given 'pass'.
+    """
+    lines = []
+    for plan in sorted(observed_plans(), key=lambda plan: plan.qualname):
+        calls = sum(plan.check_return_type.counts.values()) + plan.check_return_type.other
+        specs = [suggest_spec(counter) if param not in ("self", "cls") else None
+                 for _, param, counter, _ in plan.checks]
+        args = [spec or repr("pass") for spec in specs]
+        returns = suggest_spec(plan.check_return_type)
+        # Generator functions return generators, not their items
+        if returns is not None and not has_code_flag(plan.func, CO_GENERATOR | CO_ASYNC_GENERATOR):
+            args.append(f"check_return_type={returns}")
+        lines.append(f"# {plan.qualname}: {calls} calls observed")
+        lines.append(f"@typecheck({', '.join(args)})")
+    text = "\n".join(lines) + "\n" if lines else ""
+    if file is not None:
+        file.write(text)
+    return text
+
+typecheck.set_sampling = set_sampling
+typecheck.sampling_stats = sampling_stats
+typecheck.validate_batch = validate_batch
+typecheck.from_hints = from_hints
+typecheck.class_summary = class_summary
+typecheck.record = record
+typecheck.set_stats = set_stats
+typecheck.stats_snapshot = stats_snapshot
+typecheck.reset_stats = reset_stats
+typecheck.dump_stats = dump_stats
+typecheck.set_mode = set_mode
+typecheck.set_disabled = set_disabled
+typecheck.checked_functions = checked_functions
+typecheck.observe = observe
+typecheck.observed = observed
+typecheck.suggest_specs = suggest_specs